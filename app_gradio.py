@@ -4,7 +4,9 @@ A comprehensive web UI for the LinkedIn posting system with all features.
 """
 
 import gradio as gr
+import hashlib
 import json
+import orjson
 import os
 import sys
 import traceback
@@ -12,6 +14,7 @@ import pandas as pd
 import subprocess
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional, Tuple
@@ -21,9 +24,11 @@ sys.path.append('.')
 
 # Import our modules
 try:
-    from credentials_loader import load_credentials, get_google_sheets_config, get_linkedin_config, get_persona_path
-    from setup import LinkedInSetup, GoogleSheetsSetup, ConfigurationManager
-    from background import LinkedInScheduler, GoogleSheetsManager
+    from credentials_loader import (
+        load_credentials, get_google_sheets_config, get_linkedin_config, get_persona_path,
+        copy_file_atomic, write_bytes_atomic
+    )
+    from setup import LinkedInSetup, GoogleSheetsSetup, ConfigurationManager, PERSONA_STREAM_MIN_BYTES
     
     # Import workflow components
     from state import WorkflowState
@@ -35,6 +40,7 @@ try:
     from nodes.refine_post import refine_and_humanize_post
     from nodes.save_to_sheet import save_post_to_sheet
     from nodes.update_persona import update_persona_from_post
+    from nodes.utils import load_persona
 except ImportError as e:
     print(f"Warning: Some modules not available: {e}")
 
@@ -46,6 +52,40 @@ scheduler_running = False
 # IST timezone
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# Message shown after a post is approved and scheduled
+_APPROVAL_MESSAGE_TEMPLATE = """✅ Post approved and scheduled successfully!
+
+📝 Post Number: {post_number}
+📅 Scheduled for: {scheduled_time}
+💾 Saved to Google Sheets: {saved_to_sheet}
+👤 Persona Updated: {persona_updated}
+
+Your post will be automatically published at the scheduled time if the background scheduler is running."""
+
+# Uploaded setup files read during validation, keyed by path with their
+# (mtime_ns, size) signature, so saving reuses the bytes instead of re-reading.
+# Entries are dropped once saved; the oldest go first past the size limit
+UPLOAD_BYTES_CACHE_MAX_ENTRIES = 8
+_UPLOAD_BYTES_CACHE: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
+
+# Seconds a successful LinkedIn token validation is reused for
+TOKEN_CACHE_TTL_SECONDS = 600
+
+# sha256(access token) -> (person URN, expiry timestamp) for validated tokens
+_TOKEN_CACHE: Dict[str, Tuple[str, float]] = {}
+
+# Top-level persona sections the setup tab expects to find
+_EXPECTED_PERSONA_SECTIONS = frozenset(('basic_info', 'background', 'communication_preferences'))
+
+# Handlers running at once per event (or per shared concurrency group)
+QUEUE_CONCURRENCY_LIMIT = 4
+
+# Requests allowed to wait in the Gradio queue before new ones are rejected
+QUEUE_MAX_SIZE = 32
+
+# Concurrency group for handlers that call LinkedIn, Google Sheets or Gemini
+NETWORK_CONCURRENCY_ID = "network"
+
 
 class GradioWorkflowAdapter:
     """Adapts the CLI workflow for Gradio interface."""
@@ -80,8 +120,7 @@ class GradioWorkflowAdapter:
             # Load persona data
             try:
                 persona_path = get_persona_path()
-                with open(persona_path, 'r', encoding='utf-8') as f:
-                    persona_data = json.load(f)
+                persona_data = load_persona(persona_path)
                 
                 self.state['persona_data'] = persona_data
                 self.state['raw_input'] = content
@@ -372,12 +411,19 @@ class SetupManager:
         if not access_token.strip():
             return False, "Access token cannot be empty", ""
         
+        # Reuse a recent successful check of the same token (keyed by hash, never the token itself)
+        token_hash = hashlib.sha256(access_token.strip().encode('utf-8')).hexdigest()
+        cached = _TOKEN_CACHE.get(token_hash)
+        if cached and cached[1] > time.time():
+            return True, "LinkedIn token validated successfully", cached[0]
+        
         try:
-            person_urn = LinkedInSetup.get_person_urn(access_token.strip())
+            person_urn, message = LinkedInSetup.get_person_urn(access_token.strip())
             if person_urn:
+                _TOKEN_CACHE[token_hash] = (person_urn, time.time() + TOKEN_CACHE_TTL_SECONDS)
                 return True, "LinkedIn token validated successfully", person_urn
             else:
-                return False, "Invalid LinkedIn access token", ""
+                return False, f"Invalid LinkedIn access token\n{message}", ""
         except Exception as e:
             return False, f"Error validating token: {str(e)}", ""
     
@@ -387,16 +433,24 @@ class SetupManager:
         if not all([spreadsheet_id.strip(), sheet_name.strip(), service_account_file.strip()]):
             return False, "All Google Sheets fields are required"
         
-        if not os.path.exists(service_account_file):
+        try:
+            # Read and parse the upload once; the credentials are built from the parsed data
+            service_account_data = orjson.loads(Path(service_account_file).read_bytes())
+        except FileNotFoundError:
             return False, f"Service account file not found: {service_account_file}"
+        except (json.JSONDecodeError, orjson.JSONDecodeError):
+            return False, "Invalid JSON in service account file"
+        
+        if not isinstance(service_account_data, dict) or service_account_data.get('type') != 'service_account':
+            return False, "Uploaded file is not a service account key"
         
         try:
-            sheets_setup = GoogleSheetsSetup(service_account_file)
-            success = sheets_setup.setup_sheet(spreadsheet_id.strip(), sheet_name.strip())
+            sheets_setup = GoogleSheetsSetup(service_account_info=service_account_data)
+            success, message = sheets_setup.setup_sheet(spreadsheet_id.strip(), sheet_name.strip())
             if success:
                 return True, "Google Sheets configured successfully"
             else:
-                return False, "Failed to configure Google Sheets"
+                return False, f"Failed to configure Google Sheets\n{message}"
         except Exception as e:
             return False, f"Google Sheets error: {str(e)}"
     
@@ -406,22 +460,24 @@ class SetupManager:
         if not persona_file_path.strip():
             return False, "Persona file path is required"
         
-        if not os.path.exists(persona_file_path):
-            return False, f"Persona file not found: {persona_file_path}"
-        
         try:
-            with open(persona_file_path, 'r', encoding='utf-8') as f:
-                persona_data = json.load(f)
+            if os.path.getsize(persona_file_path) >= PERSONA_STREAM_MIN_BYTES:
+                # Scan large files for their top-level keys without loading them whole
+                found_fields = ConfigurationManager.find_top_level_keys(persona_file_path, _EXPECTED_PERSONA_SECTIONS)
+            else:
+                data = orjson.loads(SetupManager._read_upload(persona_file_path))
+                found_fields = data.keys() if isinstance(data, dict) else set()
             
             # Check for expected fields
-            expected_fields = ['basic_info', 'background', 'communication_preferences']
-            missing_fields = [field for field in expected_fields if field not in persona_data]
+            missing_fields = _EXPECTED_PERSONA_SECTIONS - found_fields
             
             if missing_fields:
-                return True, f"Persona file loaded with warnings: Missing fields: {', '.join(missing_fields)}"
+                return True, f"Persona file loaded with warnings: Missing fields: {', '.join(sorted(missing_fields))}"
             else:
                 return True, "Persona file validated successfully"
-        except json.JSONDecodeError:
+        except FileNotFoundError:
+            return False, f"Persona file not found: {persona_file_path}"
+        except ValueError:  # json, orjson and streamed parse errors
             return False, "Invalid JSON in persona file"
         except Exception as e:
             return False, f"Error reading persona file: {str(e)}"
@@ -431,15 +487,22 @@ class SetupManager:
                           sheet_name: str, service_account_file: str, persona_path: str) -> Tuple[bool, str]:
         """Save complete configuration."""
         try:
+            # Keep copies of the uploads next to credentials.json; Gradio's
+            # temporary upload files don't outlive the session
+            user_info_dir = Path('user_info')
+            user_info_dir.mkdir(exist_ok=True)
+            service_account_dest = SetupManager._copy_upload(service_account_file, user_info_dir / 'service_account.json')
+            persona_dest = SetupManager._write_upload(persona_path, user_info_dir / 'persona.json')
+            
             config = {
                 'linkedin_access_token': linkedin_token,
                 'person_urn': person_urn,
                 'google_sheets': {
                     'spreadsheet_id': spreadsheet_id,
                     'sheet_name': sheet_name,
-                    'service_account_file': os.path.abspath(service_account_file)
+                    'service_account_file': str(service_account_dest)
                 },
-                'persona_path': os.path.abspath(persona_path)
+                'persona_path': str(persona_dest)
             }
             
             success = ConfigurationManager.save_credentials(config)
@@ -449,6 +512,46 @@ class SetupManager:
                 return False, "Failed to save configuration"
         except Exception as e:
             return False, f"Error saving configuration: {str(e)}"
+    
+    @staticmethod
+    def _copy_upload(src: str, dest: Path) -> Path:
+        """Atomically copy an uploaded file to dest and return its absolute path."""
+        dest = dest.resolve()
+        if Path(src).resolve() != dest:
+            copy_file_atomic(src, dest)
+        return dest
+    
+    @staticmethod
+    def _read_upload(path: str) -> bytes:
+        """Read an uploaded file, reusing the bytes from an earlier read if it hasn't changed."""
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        
+        cached = _UPLOAD_BYTES_CACHE.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        data = Path(path).read_bytes()
+        while len(_UPLOAD_BYTES_CACHE) >= UPLOAD_BYTES_CACHE_MAX_ENTRIES:
+            _UPLOAD_BYTES_CACHE.pop(next(iter(_UPLOAD_BYTES_CACHE)), None)
+        _UPLOAD_BYTES_CACHE[path] = (signature, data)
+        return data
+    
+    @staticmethod
+    def _write_upload(src: str, dest: Path) -> Path:
+        """Write an uploaded file to dest, reusing bytes already read during validation, and return its absolute path."""
+        dest = dest.resolve()
+        if Path(src).resolve() == dest:
+            return dest
+        
+        st = os.stat(src)
+        cached = _UPLOAD_BYTES_CACHE.pop(src, None)
+        if cached and cached[0] == (st.st_mtime_ns, st.st_size):
+            write_bytes_atomic(dest, cached[1])
+        else:
+            # Not read into memory (e.g. a large, stream-checked file)
+            copy_file_atomic(src, dest)
+        return dest
 
 
 def check_system_status() -> Tuple[bool, str, Dict[str, Any]]:
@@ -483,6 +586,8 @@ def check_system_status() -> Tuple[bool, str, Dict[str, Any]]:
 def get_scheduled_posts() -> pd.DataFrame:
     """Get scheduled posts from Google Sheets."""
     try:
+        from background import GoogleSheetsManager
+        
         sheets_manager = GoogleSheetsManager()
         posts = sheets_manager.get_posts()
         
@@ -517,6 +622,8 @@ def start_background_scheduler():
         return "Background scheduler is already running"
     
     try:
+        from background import LinkedInScheduler
+        
         background_scheduler = LinkedInScheduler()
         scheduler_running = True
         
@@ -562,14 +669,15 @@ def get_scheduler_status():
         return "🔴 Stopped", "The background scheduler is not running. Posts will not be automatically published."
 
 
-# Initialize workflow adapter
-workflow_adapter = GradioWorkflowAdapter()
-
 # Create the Gradio interface
 def create_interface():
     """Create the complete Gradio interface."""
     
     with gr.Blocks(title="LinkedIn Auto Poster", theme=gr.themes.Soft()) as app:
+        # Workflow state lives in a per-session adapter so concurrent users
+        # don't overwrite each other's drafts
+        workflow_adapter_state = gr.State(GradioWorkflowAdapter)
+        
         gr.Markdown("""
         # 🚀 Automatic LinkedIn Poster
         
@@ -655,6 +763,7 @@ def create_interface():
                             gr.Markdown("### 4. Save Configuration")
                             
                             save_config_btn = gr.Button("Save Complete Configuration", variant="primary", size="lg")
+                            validate_and_save_btn = gr.Button("Validate All & Save", variant="secondary")
                             config_status = gr.Textbox(label="Configuration Status", interactive=False)
                     
                     with gr.Column(scale=1):
@@ -982,7 +1091,8 @@ Examples:
         linkedin_validate_btn.click(
             validate_linkedin_token_handler,
             inputs=[linkedin_token],
-            outputs=[linkedin_status, linkedin_urn]
+            outputs=[linkedin_status, linkedin_urn],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         def validate_google_sheets_handler(spreadsheet_id, sheet_name, service_file):
@@ -994,7 +1104,8 @@ Examples:
         sheets_validate_btn.click(
             validate_google_sheets_handler,
             inputs=[spreadsheet_id, sheet_name, service_account_file],
-            outputs=[sheets_status]
+            outputs=[sheets_status],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         def validate_persona_handler(persona_file):
@@ -1024,8 +1135,37 @@ Examples:
             outputs=[config_status]
         )
         
+        def validate_and_save_handler(token, spreadsheet_id, sheet_name, service_file, persona_file):
+            if None in [service_file, persona_file]:
+                return "", "", "", "", "Please upload all required files"
+            
+            # The three checks are independent network/file work, so run them together
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                linkedin_future = executor.submit(SetupManager.validate_linkedin_token, token)
+                sheets_future = executor.submit(SetupManager.validate_google_sheets, spreadsheet_id, sheet_name, service_file.name)
+                persona_future = executor.submit(SetupManager.validate_persona_file, persona_file.name)
+                linkedin_ok, linkedin_message, urn = linkedin_future.result()
+                sheets_ok, sheets_message = sheets_future.result()
+                persona_ok, persona_message = persona_future.result()
+            
+            if linkedin_ok and sheets_ok and persona_ok:
+                _, config_message = SetupManager.save_configuration(
+                    token, urn, spreadsheet_id, sheet_name, service_file.name, persona_file.name
+                )
+            else:
+                config_message = "Fix the validation errors above before saving"
+            
+            return linkedin_message, urn, sheets_message, persona_message, config_message
+        
+        validate_and_save_btn.click(
+            validate_and_save_handler,
+            inputs=[linkedin_token, spreadsheet_id, sheet_name, service_account_file, persona_file],
+            outputs=[linkedin_status, linkedin_urn, sheets_status, persona_status, config_status],
+            concurrency_id=NETWORK_CONCURRENCY_ID
+        )
+        
         # Post Creator handlers
-        def create_post_handler(content, attachments, scheduled_datetime, progress=gr.Progress()):
+        def create_post_handler(workflow_adapter, content, attachments, scheduled_datetime, progress=gr.Progress()):
             if not content.strip():
                 # Return tuple for all outputs: post_results, clarification_group, missing_fields_display, questions_display, answer1-5, generated_post, post_stats, post_metadata_display, event_details_display, workflow_status
                 return (gr.Group(visible=False), gr.Group(visible=False), "", "", "", "", "", "", "", "", "", "", {}, {}, "Please enter some content to create a post")
@@ -1112,7 +1252,7 @@ Examples:
             )
         
         # Clarification handlers
-        def submit_answers_handler(*answers, progress=gr.Progress()):
+        def submit_answers_handler(workflow_adapter, *answers, progress=gr.Progress()):
             """Handle submission of clarification answers."""
             # Filter out empty answers and create answer dict
             answer_dict = {}
@@ -1164,7 +1304,7 @@ Examples:
                 "✅ Post generated successfully with your additional information! Review and approve below."  # workflow_status
             )
         
-        def skip_questions_handler(progress=gr.Progress()):
+        def skip_questions_handler(workflow_adapter, progress=gr.Progress()):
             """Skip clarification questions and continue with incomplete data."""
             # Continue workflow without additional answers
             result = workflow_adapter.continue_with_clarification({}, progress)
@@ -1201,46 +1341,47 @@ Examples:
         # Connect clarification buttons
         submit_answers_btn.click(
             submit_answers_handler,
-            inputs=clarification_answers,
-            outputs=[clarification_group, post_results, generated_post, post_stats, post_metadata_display, event_details_display, workflow_status]
+            inputs=[workflow_adapter_state] + clarification_answers,
+            outputs=[clarification_group, post_results, generated_post, post_stats, post_metadata_display, event_details_display, workflow_status],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         skip_questions_btn.click(
             skip_questions_handler,
-            outputs=[clarification_group, post_results, generated_post, post_stats, post_metadata_display, event_details_display, workflow_status]
+            inputs=[workflow_adapter_state],
+            outputs=[clarification_group, post_results, generated_post, post_stats, post_metadata_display, event_details_display, workflow_status],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         create_post_btn.click(
             create_post_handler,
-            inputs=[post_content, attachments, scheduled_date],
-            outputs=[post_results, clarification_group, missing_fields_display, questions_display] + clarification_answers + [generated_post, post_stats, post_metadata_display, event_details_display, workflow_status]
+            inputs=[workflow_adapter_state, post_content, attachments, scheduled_date],
+            outputs=[post_results, clarification_group, missing_fields_display, questions_display] + clarification_answers + [generated_post, post_stats, post_metadata_display, event_details_display, workflow_status],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
-        def approve_post_handler(post_text):
+        def approve_post_handler(workflow_adapter, post_text):
             if not post_text.strip():
                 return "Please generate a post first", gr.Textbox(visible=False)
             
             result = workflow_adapter.approve_and_save_post(post_text)
             
             if result["success"]:
-                message = f"""
-                ✅ Post approved and scheduled successfully!
-                
-                📝 Post Number: {result['post_number']}
-                📅 Scheduled for: {result['scheduled_time']}
-                💾 Saved to Google Sheets: {'Yes' if result['saved_to_sheet'] else 'No'}
-                👤 Persona Updated: {'Yes' if result['persona_updated'] else 'No'}
-                
-                Your post will be automatically published at the scheduled time if the background scheduler is running.
-                """
+                message = _APPROVAL_MESSAGE_TEMPLATE.format(
+                    post_number=result['post_number'],
+                    scheduled_time=result['scheduled_time'],
+                    saved_to_sheet='Yes' if result['saved_to_sheet'] else 'No',
+                    persona_updated='Yes' if result['persona_updated'] else 'No'
+                )
                 return message, gr.Textbox(visible=True)
             else:
                 return f"❌ Error: {result['error']}", gr.Textbox(visible=True)
         
         approve_btn.click(
             approve_post_handler,
-            inputs=[generated_post],
-            outputs=[approval_status, approval_status]
+            inputs=[workflow_adapter_state, generated_post],
+            outputs=[approval_status, approval_status],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         # Revise and regenerate handlers
@@ -1252,7 +1393,7 @@ Examples:
                 revision_feedback: ""
             }
         
-        def apply_revision_handler(post_text, feedback, progress=gr.Progress()):
+        def apply_revision_handler(workflow_adapter, post_text, feedback, progress=gr.Progress()):
             """Apply user's revision feedback to the post."""
             if not post_text.strip():
                 return post_text, "", "Please generate a post first", gr.Group(visible=False)
@@ -1286,7 +1427,7 @@ Examples:
                 revision_feedback: ""
             }
         
-        def regenerate_post_handler(progress=gr.Progress()):
+        def regenerate_post_handler(workflow_adapter, progress=gr.Progress()):
             """Regenerate the post completely from scratch."""
             result = workflow_adapter.regenerate_post(progress)
             
@@ -1305,8 +1446,9 @@ Examples:
         # Connect apply revision button to process feedback
         apply_revision_btn.click(
             apply_revision_handler,
-            inputs=[generated_post, revision_feedback],
-            outputs=[generated_post, post_stats, workflow_status, revision_feedback_group]
+            inputs=[workflow_adapter_state, generated_post, revision_feedback],
+            outputs=[generated_post, post_stats, workflow_status, revision_feedback_group],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         # Connect cancel revision button
@@ -1318,7 +1460,9 @@ Examples:
         # Connect regenerate button
         regenerate_btn.click(
             regenerate_post_handler,
-            outputs=[generated_post, post_stats, workflow_status]
+            inputs=[workflow_adapter_state],
+            outputs=[generated_post, post_stats, workflow_status],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         # Dashboard handlers
@@ -1330,7 +1474,8 @@ Examples:
         
         refresh_posts_btn.click(
             refresh_posts_handler,
-            outputs=[posts_table]
+            outputs=[posts_table],
+            concurrency_id=NETWORK_CONCURRENCY_ID
         )
         
         def update_scheduler_status():
@@ -1395,11 +1540,15 @@ Examples:
 if __name__ == "__main__":
     app = create_interface()
     
+    # Queue events so slow network handlers run side by side instead of one at a time
+    app.queue(default_concurrency_limit=QUEUE_CONCURRENCY_LIMIT, max_size=QUEUE_MAX_SIZE)
+    
     # Launch with appropriate settings
     app.launch(
         server_name="0.0.0.0",
         server_port=7860,
         share=True,  # Creates public link    
         show_error=True,
+        show_api=False,
         debug=True
     )
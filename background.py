@@ -9,6 +9,8 @@ import os
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from pathlib import Path
@@ -28,6 +30,22 @@ logger = logging.getLogger(__name__)
 # IST timezone
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# (connect, read) timeouts in seconds for LinkedIn API calls and media uploads,
+# so a stalled request can't hang the scheduler loop
+LINKEDIN_API_TIMEOUT = (5, 30)
+LINKEDIN_UPLOAD_TIMEOUT = (5, 300)
+
+# Shared session for LinkedIn API calls; keeps connections alive between the
+# register/upload/post requests of each post and across scheduler runs, and
+# retries idempotent requests (not the POSTs that create content) on rate
+# limits and server errors
+_LINKEDIN_SESSION = requests.Session()
+_LINKEDIN_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+))
+
 
 class LinkedInPoster:
     """Handles LinkedIn API interactions."""
@@ -55,10 +73,11 @@ class LinkedInPoster:
             }
         }
         
-        response = requests.post(
+        response = _LINKEDIN_SESSION.post(
             f"{self.api_base}/assets?action=registerUpload",
             headers=self.headers,
-            json=register_data
+            json=register_data,
+            timeout=LINKEDIN_API_TIMEOUT
         )
         response.raise_for_status()
         
@@ -70,10 +89,11 @@ class LinkedInPoster:
     def upload_media(self, upload_url: str, file_path: str):
         """Upload media file."""
         with open(file_path, 'rb') as file:
-            response = requests.put(
+            response = _LINKEDIN_SESSION.put(
                 upload_url,
                 headers={"Authorization": f"Bearer {self.access_token}"},
-                data=file.read()
+                data=file.read(),
+                timeout=LINKEDIN_UPLOAD_TIMEOUT
             )
             response.raise_for_status()
     
@@ -127,10 +147,11 @@ class LinkedInPoster:
             else:
                 return self.create_post(text, None)
         
-        response = requests.post(
+        response = _LINKEDIN_SESSION.post(
             f"{self.api_base}/ugcPosts",
             headers=self.headers,
-            json=post_data
+            json=post_data,
+            timeout=LINKEDIN_API_TIMEOUT
         )
         response.raise_for_status()
         
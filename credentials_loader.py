@@ -6,8 +6,23 @@ from the credentials.json file, ensuring consistent access across all modules.
 """
 
 import json
+import os
+import shutil
+import stat
+import tempfile
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, BinaryIO, Callable, Optional, Tuple, Union
+
+# Buffer size for copying uploaded configuration files
+COPY_BUFFER_SIZE = 1 << 20
+
+# Process umask, read once at import (os.umask can only be read by setting it),
+# used for the permissions of files that don't exist yet
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Parsed credentials files keyed by path, tagged with the (mtime, size) they were read at
+_CREDENTIALS_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
 
 
 def load_credentials(credentials_path: Optional[str] = None) -> Dict[str, Any]:
@@ -34,11 +49,23 @@ def load_credentials(credentials_path: Optional[str] = None) -> Dict[str, Any]:
         if not creds_path.exists():
             creds_path = Path('user_info/credentials.json')
     
-    if not creds_path.exists():
+    try:
+        st = creds_path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Credentials file not found at: {creds_path}")
     
+    # Reuse the parsed file until it is modified (e.g. by re-running setup)
+    cache_key = str(creds_path)
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _CREDENTIALS_CACHE.get(cache_key)
+    if cached and cached[0] == signature:
+        return cached[1]
+    
     with open(creds_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        credentials = json.load(f)
+    
+    _CREDENTIALS_CACHE[cache_key] = (signature, credentials)
+    return credentials
 
 
 def get_service_account_file_path(credentials_path: Optional[str] = None) -> str:
@@ -173,3 +200,61 @@ def get_credentials_aware_sheets_setup():
     
     service_account_file = get_service_account_file_path()
     return GoogleSheetsSetup(service_account_file)
+
+
+def replace_file_atomic(path: Union[str, Path], fill: Callable[[BinaryIO], Any]) -> None:
+    """
+    Produce a file next to path and swap it into place in one step.
+    
+    Readers only ever see the old or the new contents, and an interrupted
+    write (including Ctrl-C) leaves the original file untouched. Each call
+    writes to its own temporary file, so concurrent writers in one process
+    never mix their data. An existing file keeps its permissions; a new one
+    gets the usual umask-based mode.
+    
+    Args:
+        path: File to write
+        fill: Writes the complete new contents to the open temporary file
+    """
+    path = Path(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            fill(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; give it the target's mode before the swap
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_bytes_atomic(path: Union[str, Path], data: bytes) -> None:
+    """
+    Atomically replace a file with the given bytes.
+    
+    Args:
+        path: File to write
+        data: Complete new file contents
+    """
+    replace_file_atomic(path, lambda f: f.write(data))
+
+
+def copy_file_atomic(src: Union[str, Path], path: Union[str, Path]) -> None:
+    """
+    Atomically replace a file with a copy of another file.
+    
+    Args:
+        src: File to copy
+        path: File to write
+    """
+    with open(src, 'rb') as source:
+        replace_file_atomic(path, lambda f: shutil.copyfileobj(source, f, COPY_BUFFER_SIZE))
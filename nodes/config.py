@@ -0,0 +1,29 @@
+"""
+Configuration for the workflow nodes, read once from the environment (and .env file).
+"""
+
+import functools
+import os
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment settings used by the nodes."""
+    google_api_key: Optional[str]  # API key for Gemini
+
+
+@functools.lru_cache(maxsize=1)
+def settings() -> Settings:
+    """
+    Get the node settings, loading the .env file on first use.
+
+    Returns:
+        Settings read from the environment
+    """
+    load_dotenv()
+    return Settings(
+        google_api_key=os.getenv("GOOGLE_API_KEY")
+    )
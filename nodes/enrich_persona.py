@@ -3,16 +3,10 @@ Enrich Persona Node - LLM Stage 3: Integrates complete persona context into the
 """
 
 import json
-import os
 from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
-import sys
-sys.path.append('..')
 from state import WorkflowState
-
-load_dotenv()
+from .utils import dumps_pretty, get_llm
 
 
 def enrich_with_persona(state: WorkflowState) -> WorkflowState:
@@ -35,11 +29,7 @@ def enrich_with_persona(state: WorkflowState) -> WorkflowState:
             return state
         
         # Initialize Gemini Flash
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.6,
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
+        llm = get_llm(0.6)
         
         # Use the complete persona data directly
         persona_data = state.get('persona_data', {})
@@ -116,10 +106,10 @@ IMPORTANT: Only extract information that actually exists in the persona file. Do
         user_message = f"""Analyze this post content and extract ONLY the relevant persona elements that would enhance this specific LinkedIn post.
 
 POST CONTENT:
-{json.dumps(post_context, indent=2)}
+{dumps_pretty(post_context)}
 
 USER PERSONA FILE:
-{json.dumps(persona_data, indent=2)}
+{dumps_pretty(persona_data)}
 
 INSTRUCTIONS:
 1. Be selective - only extract persona elements that directly relate to this post topic
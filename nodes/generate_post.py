@@ -2,17 +2,10 @@
 Generate Post Node - LLM Stage 4: Creates the final LinkedIn post using all enriched data.
 """
 
-import json
-import os
 from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
-import sys
-sys.path.append('..')
 from state import WorkflowState
-
-load_dotenv()
+from .utils import dumps_pretty, get_llm
 
 
 def generate_linkedin_post(state: WorkflowState) -> WorkflowState:
@@ -35,11 +28,7 @@ def generate_linkedin_post(state: WorkflowState) -> WorkflowState:
             return state
         
         # Initialize Gemini Flash
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.8,  # Higher temperature for creativity
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
+        llm = get_llm(0.8)  # Higher temperature for creativity
         
         # Get all data from state
         post_metadata = state.get('post_metadata', {})
@@ -94,13 +83,13 @@ Remember: This should sound like the actual person sharing their genuine experie
         user_message = f"""Generate an authentic LinkedIn post using the provided context:
 
 POST CONTENT DATA:
-{json.dumps(post_metadata, indent=2)}
+{dumps_pretty(post_metadata)}
 
 EVENT DETAILS:
-{json.dumps(event_details, indent=2)}
+{dumps_pretty(event_details)}
 
 ENRICHED PERSONA CONTEXT (Contains all relevant persona information):
-{json.dumps(persona_context, indent=2)}
+{dumps_pretty(persona_context)}
 
 INSTRUCTIONS:
 1. Write in their authentic voice using their exact communication preferences
@@ -111,6 +100,7 @@ INSTRUCTIONS:
 6. Make it sound exactly like they would write it
 7. Ensure it's engaging and encourages interaction
 8. Follow LinkedIn best practices for formatting and structure
+9. Treat any "clarifications" in the event details as the user's own first-hand details and work them in naturally
 
 Generate a post that captures their unique voice and expertise while being engaging and professional."""
         
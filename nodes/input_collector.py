@@ -2,14 +2,16 @@
 Input Collector Node - Gathers initial user input for LinkedIn post creation.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
 import os
+import stat
 from pathlib import Path
-import sys
-sys.path.append('..')
+from typing import Optional, Tuple
 from state import WorkflowState
 from credentials_loader import get_persona_path
+from .utils import load_persona
 
 
 def collect_user_input(state: WorkflowState) -> WorkflowState:
@@ -29,8 +31,7 @@ def collect_user_input(state: WorkflowState) -> WorkflowState:
     try:
         # Load persona data using credentials_loader
         persona_path = get_persona_path()
-        with open(persona_path, 'r', encoding='utf-8') as f:
-            persona_data = json.load(f)
+        persona_data = load_persona(persona_path)
         
         print(f"\n✅ Loaded persona for: {persona_data.get('basic_info', {}).get('full_name', 'User')}")
         
@@ -66,25 +67,25 @@ def collect_user_input(state: WorkflowState) -> WorkflowState:
         media_paths = []
         if has_attachments == 'yes':
             print("\nEnter file paths (one per line, type 'DONE' when finished):")
+            candidates = []
             while True:
                 path = input().strip()
                 if path.upper() == 'DONE':
                     break
                 if path:
-                    try:
-                        # Validate path exists and is accessible
-                        path_obj = Path(path)
-                        if path_obj.exists() and path_obj.is_file():
-                            # Check if file is readable
-                            if os.access(path, os.R_OK):
-                                media_paths.append(str(path_obj.absolute()))
-                                print(f"✅ Added: {path}")
-                            else:
-                                print(f"⚠️ File not readable: {path}")
-                        else:
-                            print(f"⚠️ File not found or not a file: {path}")
-                    except (OSError, ValueError) as e:
-                        print(f"⚠️ Invalid path: {path} - {e}")
+                    candidates.append(path)
+            
+            # Validate all entered paths at once so the filesystem checks overlap
+            if candidates:
+                with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as executor:
+                    results = list(executor.map(validate_media_path, candidates))
+                
+                for path, (resolved_path, problem) in zip(candidates, results):
+                    if resolved_path:
+                        media_paths.append(resolved_path)
+                        print(f"✅ Added: {path}")
+                    else:
+                        print(f"⚠️ {problem}")
         
         # Collect scheduling information
         print("\n" + "-"*40)
@@ -134,3 +135,27 @@ def collect_user_input(state: WorkflowState) -> WorkflowState:
         state['error'] = f"Unexpected error in input collection: {str(e)}"
         state['error_node'] = "input_collector"
         return state
+
+
+def validate_media_path(path: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Check that an attachment path points to a readable file.
+    
+    Args:
+        path: File path entered by the user
+        
+    Returns:
+        Tuple of (absolute_path, None) if valid, otherwise (None, problem description)
+    """
+    try:
+        # A single stat() answers both "exists" and "is a regular file"
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode):
+            return None, f"File not found or not a file: {path}"
+        if not os.access(path, os.R_OK):
+            return None, f"File not readable: {path}"
+        return str(Path(path).absolute()), None
+    except FileNotFoundError:
+        return None, f"File not found or not a file: {path}"
+    except (OSError, ValueError) as e:
+        return None, f"Invalid path: {path} - {e}"
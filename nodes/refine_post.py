@@ -3,17 +3,15 @@ Refine Post Node - LLM Stage 5: Humanizes and refines the generated LinkedIn pos
 Focuses on making content more authentic, engaging, and natural while maintaining professionalism.
 """
 
-import json
-import os
-from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
+import functools
+import re
+from typing import Dict, Any, Optional, Tuple
 from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
-import sys
-sys.path.append('..')
 from state import WorkflowState
+from .utils import dumps_pretty, get_llm
 
-load_dotenv()
+# Runs of digits, used to gauge how many specific numbers/details a post contains
+_DIGIT_RE = re.compile(r'\d+')
 
 
 def refine_and_humanize_post(state: WorkflowState) -> WorkflowState:
@@ -36,25 +34,128 @@ def refine_and_humanize_post(state: WorkflowState) -> WorkflowState:
         if state.get('error'):
             return state
         
-        # Initialize Gemini Flash with slightly higher temperature for creativity
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.8,  # Higher temperature for more creative refinement
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
+        # Gemini Flash with slightly higher temperature for more creative refinement
+        llm = get_llm(0.8)
+        
+        # Persona- and metadata-derived inputs don't depend on the draft, so they
+        # are prepared independently of the Stage 4 output
+        system_prompt, base_context = prepare_refinement_context(state)
         
-        # Get all relevant data
         draft_post = state.get('draft_post', '')
-        post_metadata = state.get('post_metadata', {})
-        event_details = state.get('event_details', {})
-        persona_data = state.get('persona_data', {})
-        persona_context = state.get('persona_context', {})
+        refinement_context = {"original_post": draft_post, **base_context}
+
+        user_message = f"""Transform this LinkedIn post into something that feels genuinely human-written:
+
+        ORIGINAL POST:
+        {draft_post}
+
+        CONTEXT:
+        {dumps_pretty(refinement_context)}
+
+        YOUR TASK:
+        Rewrite this as if you're a real person sharing a genuine experience. Make it feel like something an actual human would write - imperfect, authentic, and relatable. Include:
+
+        1. A compelling opening moment (not "I'm excited to share...")
+        2. Specific, visualizable details that paint the picture
+        3. The messy or challenging parts (what really happened)
+        4. Your genuine emotional reaction and learning
+        5. A real question that invites authentic responses
+
+        Write like you're telling this story to a friend, not delivering a corporate announcement. Make every sentence feel human and conversational."""
+
+        # Get refinement response
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_message)
+        ]
+
+        print("✨ Humanizing and refining your post...")
+        response = llm.invoke(messages)
+
+        # Extract the refined post
+        refined_post = response.content.strip()
+
+        # Store the refined post and metadata
+        state['refined_post'] = refined_post
+        state['draft_post'] = refined_post  # Update draft_post for approval process
         
-        # Extract communication preferences
-        comm_prefs = persona_data.get('communication_preferences', {})
+        # Word counts are reused by the metadata, the change analysis and the summary
+        original_words = len(draft_post.split())
+        refined_words = len(refined_post.split())
         
-        # Create comprehensive refinement system prompt
-        system_prompt = f"""You are a human LinkedIn user who writes incredibly engaging, authentic posts that feel genuinely personal. Your writing style is natural, conversational, and never sounds like AI-generated content.
+        # Add refinement metadata
+        refinement_metadata = {
+            'original_length': original_words,
+            'refined_length': refined_words,
+            'refinement_focus': [
+                'humanization',
+                'engagement_optimization', 
+                'authenticity_enhancement',
+                'flow_improvement'
+            ],
+            'changes_made': analyze_changes(draft_post, refined_post, original_words, refined_words)
+        }
+        state['refinement_metadata'] = refinement_metadata
+        
+        # Emit the whole summary in one write once the refinement is done
+        print(format_refinement_summary(draft_post, refined_post, refinement_metadata))
+
+        return state
+
+    except Exception as e:
+        state['error'] = f"Error in post refinement: {str(e)}"
+        state['error_node'] = "refine_post"
+        print(f"❌ Error: {str(e)}")
+        return state
+
+
+def prepare_refinement_context(state: WorkflowState) -> Tuple[str, Dict[str, Any]]:
+    """
+    Prepare the parts of the refinement request that don't depend on the draft post.
+    
+    Args:
+        state: Current workflow state with persona and post metadata
+        
+    Returns:
+        Tuple of (system_prompt, refinement_context without the original post)
+    """
+    post_metadata = state.get('post_metadata', {})
+    persona_data = state.get('persona_data', {})
+    persona_context = state.get('persona_context', {})
+    
+    # Extract communication preferences
+    comm_prefs = persona_data.get('communication_preferences', {})
+    
+    # The system prompt only varies with the tone, so it is built once per tone
+    system_prompt = build_refinement_system_prompt(str(persona_context.get('tone', 'conversational and genuine')))
+
+    refinement_context = {
+        "event_type": post_metadata.get('event_type', 'experience'),
+        "industry": persona_data.get('basic_info', {}).get('industry', 'Professional'),
+        "author_style": persona_context.get('writing_style_notes', 'conversational'),
+        "target_audience": persona_data.get('network_context', {}).get('target_audience', []),
+        "values": persona_data.get('professional_goals', {}).get('values', []),
+        "communication_preferences": comm_prefs
+    }
+    
+    return system_prompt, refinement_context
+
+
+@functools.lru_cache(maxsize=16)
+def build_refinement_system_prompt(tone: str) -> str:
+    """
+    Build the refinement system prompt for a given writing tone.
+    
+    The prompt is otherwise static, so results are cached per tone and a
+    deployment with a fixed persona formats it only once.
+    
+    Args:
+        tone: Writing tone to embed in the prompt
+        
+    Returns:
+        Complete system prompt text
+    """
+    return f"""You are a human LinkedIn user who writes incredibly engaging, authentic posts that feel genuinely personal. Your writing style is natural, conversational, and never sounds like AI-generated content.
 
         YOUR WRITING PHILOSOPHY:
         - Write like you're talking to a close colleague over coffee
@@ -108,7 +209,7 @@ def refine_and_humanize_post(state: WorkflowState) -> WorkflowState:
         - Use parentheses for side thoughts (like real people do)
         - Include minor, relatable complaints or observations
 
-        TONE: {persona_context.get('tone', 'conversational and genuine')}
+        TONE: {tone}
         
         STRUCTURE FOR HUMAN POSTS:
         - Hook: A moment or realization that grabs attention
@@ -127,102 +228,17 @@ def refine_and_humanize_post(state: WorkflowState) -> WorkflowState:
 
         Output ONLY the refined post content, nothing else."""
 
-        # Prepare the refinement context
-        refinement_context = {
-            "original_post": draft_post,
-            "event_type": post_metadata.get('event_type', 'experience'),
-            "industry": persona_data.get('basic_info', {}).get('industry', 'Professional'),
-            "author_style": persona_context.get('writing_style_notes', 'conversational'),
-            "target_audience": persona_data.get('network_context', {}).get('target_audience', []),
-            "values": persona_data.get('professional_goals', {}).get('values', []),
-            "communication_preferences": comm_prefs
-        }
-
-        user_message = f"""Transform this LinkedIn post into something that feels genuinely human-written:
-
-        ORIGINAL POST:
-        {draft_post}
-
-        CONTEXT:
-        {json.dumps(refinement_context, indent=2)}
-
-        YOUR TASK:
-        Rewrite this as if you're a real person sharing a genuine experience. Make it feel like something an actual human would write - imperfect, authentic, and relatable. Include:
-
-        1. A compelling opening moment (not "I'm excited to share...")
-        2. Specific, visualizable details that paint the picture
-        3. The messy or challenging parts (what really happened)
-        4. Your genuine emotional reaction and learning
-        5. A real question that invites authentic responses
-
-        Write like you're telling this story to a friend, not delivering a corporate announcement. Make every sentence feel human and conversational."""
-
-        # Get refinement response
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message)
-        ]
-
-        print("✨ Humanizing and refining your post...")
-        response = llm.invoke(messages)
 
-        # Extract the refined post
-        refined_post = response.content.strip()
-
-        # Store the refined post and metadata
-        state['refined_post'] = refined_post
-        state['draft_post'] = refined_post  # Update draft_post for approval process
-        
-        # Add refinement metadata
-        refinement_metadata = {
-            'original_length': len(draft_post.split()),
-            'refined_length': len(refined_post.split()),
-            'refinement_focus': [
-                'humanization',
-                'engagement_optimization', 
-                'authenticity_enhancement',
-                'flow_improvement'
-            ],
-            'changes_made': analyze_changes(draft_post, refined_post)
-        }
-        state['refinement_metadata'] = refinement_metadata
-
-        # Calculate improvement metrics
-        original_words = len(draft_post.split())
-        refined_words = len(refined_post.split())
-        
-        print("\n✅ Post refined and humanized successfully!")
-        print(f"   • Original length: {original_words} words")
-        print(f"   • Refined length: {refined_words} words")
-        print(f"   • Focus: Humanization + Engagement")
-        
-        # Show key improvements made
-        improvements = refinement_metadata['changes_made']
-        if improvements:
-            print(f"   • Key improvements: {', '.join(improvements[:3])}")
-
-        # Show preview comparison
-        print(f"\n🔄 Refinement Preview:")
-        print(f"   Original hook: {draft_post[:80]}...")
-        refined_preview = refined_post[:80] + "..." if len(refined_post) > 80 else refined_post
-        print(f"   Refined hook:  {refined_preview}")
-
-        return state
-
-    except Exception as e:
-        state['error'] = f"Error in post refinement: {str(e)}"
-        state['error_node'] = "refine_post"
-        print(f"❌ Error: {str(e)}")
-        return state
-
-
-def analyze_changes(original: str, refined: str) -> list:
+def analyze_changes(original: str, refined: str,
+                    original_words: Optional[int] = None, refined_words: Optional[int] = None) -> list:
     """
     Analyze the key changes made during refinement.
     
     Args:
         original: Original post content
         refined: Refined post content
+        original_words: Word count of the original post, if already known
+        refined_words: Word count of the refined post, if already known
         
     Returns:
         List of improvement categories
@@ -252,10 +268,7 @@ def analyze_changes(original: str, refined: str) -> list:
         improvements.append('better_formatting')
     
     # Specific numbers or details
-    import re
-    original_numbers = len(re.findall(r'\d+', original))
-    refined_numbers = len(re.findall(r'\d+', refined))
-    if refined_numbers > original_numbers:
+    if count_digit_runs(refined) > count_digit_runs(original):
         improvements.append('added_specifics')
     
     # Hook improvement (first 50 characters significantly different)
@@ -263,8 +276,10 @@ def analyze_changes(original: str, refined: str) -> list:
         improvements.append('improved_hook')
     
     # Length optimization
-    original_words = len(original.split())
-    refined_words = len(refined.split())
+    if original_words is None:
+        original_words = len(original.split())
+    if refined_words is None:
+        refined_words = len(refined.split())
     if abs(refined_words - 200) < abs(original_words - 200):  # 200 is optimal LinkedIn length
         improvements.append('optimized_length')
     
@@ -301,8 +316,7 @@ def get_refinement_suggestions(post_content: str, persona_data: dict) -> list:
         suggestions.append("Add more personal touches to increase authenticity")
     
     # Check for specific details
-    import re
-    if len(re.findall(r'\d+', post_content)) < 2:
+    if count_digit_runs(post_content) < 2:
         suggestions.append("Include specific numbers or metrics where relevant")
     
     # Check for line breaks (mobile optimization)
@@ -311,4 +325,44 @@ def get_refinement_suggestions(post_content: str, persona_data: dict) -> list:
     if long_paragraphs:
         suggestions.append("Break up long paragraphs for mobile readability")
     
-    return suggestions
\ No newline at end of file
+    return suggestions
+
+
+def format_refinement_summary(original: str, refined: str, refinement_metadata: Dict[str, Any]) -> str:
+    """
+    Build the console summary shown after a post has been refined.
+    
+    Args:
+        original: Post content before refinement
+        refined: Post content after refinement
+        refinement_metadata: Metadata produced by the refinement stage
+        
+    Returns:
+        Multi-line summary text
+    """
+    lines = [
+        "\n✅ Post refined and humanized successfully!",
+        f"   • Original length: {refinement_metadata['original_length']} words",
+        f"   • Refined length: {refinement_metadata['refined_length']} words",
+        "   • Focus: Humanization + Engagement",
+    ]
+    
+    # Show key improvements made
+    improvements = refinement_metadata.get('changes_made')
+    if improvements:
+        lines.append(f"   • Key improvements: {', '.join(improvements[:3])}")
+    
+    # Show preview comparison
+    refined_preview = refined[:80] + "..." if len(refined) > 80 else refined
+    lines.extend([
+        "\n🔄 Refinement Preview:",
+        f"   Original hook: {original[:80]}...",
+        f"   Refined hook:  {refined_preview}",
+    ])
+    
+    return "\n".join(lines)
+
+
+def count_digit_runs(text: str) -> int:
+    """Count runs of digits in text without building a list of matches."""
+    return sum(1 for _ in _DIGIT_RE.finditer(text))
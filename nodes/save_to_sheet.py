@@ -2,15 +2,22 @@
 Save to Sheet Node - Saves approved posts to Google Sheets for scheduling.
 """
 
+import functools
+import time
 from datetime import datetime
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import sys
-sys.path.append('..')
+from typing import List, Optional
 from state import WorkflowState
 from credentials_loader import get_google_sheets_config
 
+# Next post number: one more than the largest number above the new row. The range
+# starts at the header (MAX ignores its text) so the first data row never refers
+# to itself. The cell keeps the formula, so the sheet shows the number it
+# evaluates to
+POST_NUMBER_FORMULA = '=IFERROR(MAX(INDIRECT("A1:A"&(ROW()-1)))+1,1)'
+
+# Retries for a rate-limited (429) append; other failures may have written the row
+APPEND_RATE_LIMIT_RETRIES = 3
+
 
 def save_post_to_sheet(state: WorkflowState) -> WorkflowState:
     """
@@ -26,6 +33,9 @@ def save_post_to_sheet(state: WorkflowState) -> WorkflowState:
     print("💾 Saving to Google Sheets")
     print("-"*40)
     
+    # Imported here so workflows that never reach this node don't pay for the Google client
+    from googleapiclient.errors import HttpError
+    
     try:
         # Check for errors or cancellation
         if state.get('error'):
@@ -44,67 +54,19 @@ def save_post_to_sheet(state: WorkflowState) -> WorkflowState:
         
         # Initialize Google Sheets service
         print("🔐 Authenticating with Google Sheets...")
-        creds = service_account.Credentials.from_service_account_file(
-            service_account_file,
-            scopes=['https://www.googleapis.com/auth/spreadsheets']
-        )
-        service = build('sheets', 'v4', credentials=creds)
-        
-        # Get the current data to determine post_number
-        range_name = f"{sheet_name}!A:E"
-        try:
-            result = service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=range_name
-            ).execute()
-            values = result.get('values', [])
-            
-            # Calculate next post number
-            if len(values) > 1:  # Skip header row
-                # Get the last post number
-                last_row = values[-1]
-                if last_row and len(last_row) > 0 and last_row[0].isdigit():
-                    post_number = int(last_row[0]) + 1
-                else:
-                    post_number = len(values)  # Fallback to row count
-            else:
-                post_number = 1
-                
-        except HttpError:
-            # If sheet is empty or doesn't exist, start with 1
-            post_number = 1
-        
-        print(f"📝 Assigning post number: {post_number}")
+        service = _get_sheets_service(service_account_file)
         
         # Prepare the row data
-        # Format: [post_number, post, attachments, to_be_posted_at, posted_at]
-        attachments = ""
-        if state.get('media_paths'):
-            attachments = ", ".join(state['media_paths'])
-        
         scheduled_time = state.get('scheduled_time', datetime.now().strftime("%Y-%m-%d %H:%M"))
-        
-        row_data = [
-            [
-                str(post_number),
-                state['final_post'],
-                attachments,
-                scheduled_time,
-                ""  # posted_at will be filled by background.py
-            ]
-        ]
+        row = build_post_row(state['final_post'], state.get('media_paths'), scheduled_time)
         
         # Append to sheet
         print("📤 Writing to Google Sheet...")
-        body = {'values': row_data}
-        
-        append_result = service.spreadsheets().values().append(
-            spreadsheetId=spreadsheet_id,
-            range=f"{sheet_name}!A:E",
-            valueInputOption='RAW',
-            insertDataOption='INSERT_ROWS',
-            body=body
-        ).execute()
+        post_number = append_post_rows(service, spreadsheet_id, sheet_name, [row])[0]
+        if post_number is None:
+            print("⚠️ Post saved, but its post number could not be read back; check column A in the sheet")
+        else:
+            print(f"📝 Assigned post number: {post_number}")
         
         # Update state
         state['post_number'] = post_number
@@ -139,3 +101,135 @@ def save_post_to_sheet(state: WorkflowState) -> WorkflowState:
         state['error_node'] = "save_to_sheet"
         print(f"❌ Error: {str(e)}")
         return state
+
+
+@functools.lru_cache(maxsize=4)
+def _get_sheets_service(service_account_file: str):
+    """
+    Build a Google Sheets service for a service account, cached per key file.
+    
+    Reusing the service keeps its credentials and HTTP connection alive across
+    saves instead of repeating the auth handshake for every post.
+    
+    Args:
+        service_account_file: Path to the service account JSON key
+        
+    Returns:
+        Google Sheets API service resource
+    """
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+    
+    creds = service_account.Credentials.from_service_account_file(
+        service_account_file,
+        scopes=['https://www.googleapis.com/auth/spreadsheets']
+    )
+    # Use the discovery document bundled with the client instead of fetching it
+    return build('sheets', 'v4', credentials=creds, cache_discovery=False, static_discovery=True)
+
+
+def _as_text(value: str) -> str:
+    """
+    Quote a cell value so Sheets stores it as plain text under USER_ENTERED input.
+    
+    Args:
+        value: Cell text
+        
+    Returns:
+        Value prefixed with an apostrophe, or an empty string
+    """
+    return f"'{value}" if value else ""
+
+
+def build_post_row(final_post: str, media_paths: Optional[List[str]], scheduled_time: str) -> List[str]:
+    """
+    Build a sheet row for a post.
+    
+    The post number is computed by the sheet itself, so a save needs no prior
+    read. Text cells are quoted so USER_ENTERED input keeps them literal (no
+    date or formula parsing).
+    
+    Args:
+        final_post: Approved post content
+        media_paths: Attachment paths, if any
+        scheduled_time: When the post should go out
+        
+    Returns:
+        Row in the format [post_number, post, attachments, to_be_posted_at, posted_at]
+    """
+    attachments = ", ".join(media_paths) if media_paths else ""
+    return [
+        POST_NUMBER_FORMULA,
+        _as_text(final_post),
+        _as_text(attachments),
+        _as_text(scheduled_time),
+        ""  # posted_at will be filled by background.py
+    ]
+
+
+def append_post_rows(service, spreadsheet_id: str, sheet_name: str, rows: List[List[str]]) -> List[Optional[int]]:
+    """
+    Append post rows to the sheet in a single API call.
+    
+    The rows are in the sheet once the append succeeds, so nothing after it
+    raises: a post number that didn't evaluate to a number is reported as None
+    rather than failing a save that background.py will still publish.
+    
+    Args:
+        service: Google Sheets API service
+        spreadsheet_id: Target spreadsheet
+        sheet_name: Target sheet (tab) name
+        rows: Rows built with build_post_row
+        
+    Returns:
+        Post numbers assigned to the rows, in order (None where unavailable)
+    """
+    append_request = service.spreadsheets().values().append(
+        spreadsheetId=spreadsheet_id,
+        range=f"{sheet_name}!A:E",
+        valueInputOption='USER_ENTERED',
+        insertDataOption='INSERT_ROWS',
+        includeValuesInResponse=True,
+        responseValueRenderOption='UNFORMATTED_VALUE',
+        body={'values': rows}
+    )
+    append_result = _execute_append(append_request)
+    
+    updates = append_result.get('updates', {})
+    values = updates.get('updatedData', {}).get('values', [])
+    post_numbers = []
+    for i in range(len(rows)):
+        cell = values[i][0] if i < len(values) and values[i] else None
+        if isinstance(cell, (int, float)):
+            post_numbers.append(int(cell))
+        else:
+            # Don't guess a number: it would not match what the sheet shows
+            print(f"⚠️ Post number formula gave {cell!r} in {updates.get('updatedRange', sheet_name)}")
+            post_numbers.append(None)
+    return post_numbers
+
+
+def _execute_append(request) -> dict:
+    """
+    Execute an append request, retrying only when it was rate limited.
+    
+    Appends are not idempotent: after a 5xx or a dropped connection the row may
+    already be in the sheet, and sending it again would schedule the post twice.
+    A 429 is rejected before anything is written, so only that is retried.
+    
+    Args:
+        request: Prepared values().append request
+        
+    Returns:
+        API response
+    """
+    from googleapiclient.errors import HttpError
+    
+    for attempt in range(APPEND_RATE_LIMIT_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status != 429 or attempt == APPEND_RATE_LIMIT_RETRIES:
+                raise
+            print("⏳ Google Sheets rate limit hit, retrying...")
+            time.sleep(2 ** attempt)
@@ -3,17 +3,42 @@ Structure Input Node - LLM Stage 1: Converts rough user input into structured JS
 """
 
 import json
-import os
-from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
-import sys
-sys.path.append('..')
+from typing import Dict, Any, Optional
+import orjson
+from langchain_core.messages import HumanMessage
 from state import WorkflowState, PostMetadata, EventDetails
-from .utils import parse_llm_json_response
+from .utils import get_llm, parse_llm_json_response
 
-load_dotenv()
+# Instructions for structuring rough notes, sent ahead of the user's input
+STRUCTURE_INPUT_PROMPT = """You are an expert at structuring LinkedIn post content.
+Convert the user's rough notes into a well-organized JSON structure.
+
+Analyze the input and extract the following information:
+
+POST METADATA:
+- event_type: Categorize as one of: project | hackathon | internship | competition | achievement | learning | experience | collaboration | talk/event
+- title_hook: Create a catchy first line if not provided (optional)
+- date_of_event: Extract date if mentioned (format: YYYY-MM-DD)
+
+EVENT DETAILS:
+- description: Clear context of what happened
+- role: What the user specifically did
+- tools_skills: List of technologies/skills used (as array)
+- challenges: Problems faced and how they were solved
+- learnings: Key personal takeaways
+- outcome: Results, recognition, or usefulness
+- acknowledgements: People or organizations to thank/tag (as array)
+- engagement_question: A question to drive interaction (you can suggest one)
+- attachments: Keep any mentioned media paths (as array)
+
+Output ONLY valid JSON with these two objects:
+{
+    "post_metadata": {...},
+    "event_details": {...}
+}
+
+If information is not explicitly provided, use null for that field.
+Be thorough but don't make up information that isn't implied in the input."""
 
 
 def structure_user_input(state: WorkflowState) -> WorkflowState:
@@ -35,66 +60,29 @@ def structure_user_input(state: WorkflowState) -> WorkflowState:
         if state.get('error'):
             return state
         
-        # Initialize Gemini Flash
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.7,
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
-        
-        # Create system prompt
-        system_prompt = """You are an expert at structuring LinkedIn post content. 
-        Convert the user's rough notes into a well-organized JSON structure.
-        
-        Analyze the input and extract the following information:
-        
-        POST METADATA:
-        - event_type: Categorize as one of: project | hackathon | internship | competition | achievement | learning | experience | collaboration | talk/event
-        - title_hook: Create a catchy first line if not provided (optional)
-        - date_of_event: Extract date if mentioned (format: YYYY-MM-DD)
-        
-        EVENT DETAILS:
-        - description: Clear context of what happened
-        - role: What the user specifically did
-        - tools_skills: List of technologies/skills used (as array)
-        - challenges: Problems faced and how they were solved
-        - learnings: Key personal takeaways
-        - outcome: Results, recognition, or usefulness
-        - acknowledgements: People or organizations to thank/tag (as array)
-        - engagement_question: A question to drive interaction (you can suggest one)
-        - attachments: Keep any mentioned media paths (as array)
-        
-        Output ONLY valid JSON with these two objects:
-        {
-            "post_metadata": {...},
-            "event_details": {...}
-        }
-        
-        If information is not explicitly provided, use null for that field.
-        Be thorough but don't make up information that isn't implied in the input."""
-        
-        # Create user message with the raw input
-        user_message = f"""Please structure the following rough notes into JSON format:
-        
-        {state['raw_input']}
-        
-        {f"Note: User has provided these attachment paths: {state['media_paths']}" if state.get('media_paths') else ""}"""
-        
-        # Get LLM response
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message)
-        ]
-        
-        print("📝 Processing raw input...")
-        response = llm.invoke(messages)
-        
-        # Parse JSON response using robust utility function
-        fallback_data = {
-            "post_metadata": {},
-            "event_details": {}
-        }
-        structured_data = parse_llm_json_response(response.content, fallback_data)
+        # Input that is already structured JSON doesn't need the LLM
+        structured_data = parse_prestructured_input(state['raw_input'])
+        if structured_data is not None:
+            print("📝 Input is already structured, skipping LLM")
+        else:
+            # Gemini Flash in JSON mode, so the response is a bare JSON document
+            llm = get_llm(0.7, json_mode=True)
+            
+            # Single message: the static instructions followed by the user's notes
+            attachments_hint = f"\nNote: User has provided these attachment paths: {state['media_paths']}" if state.get('media_paths') else ""
+            messages = [
+                HumanMessage(content=f"{STRUCTURE_INPUT_PROMPT}\n\n---\nROUGH NOTES:\n{state['raw_input']}\n{attachments_hint}")
+            ]
+            
+            print("📝 Processing raw input...")
+            response = llm.invoke(messages)
+            
+            # Parse JSON response using robust utility function
+            fallback_data = {
+                "post_metadata": {},
+                "event_details": {}
+            }
+            structured_data = parse_llm_json_response(response.content, fallback_data)
         
         # Update state with structured data
         state['post_metadata'] = structured_data.get('post_metadata', {})
@@ -123,3 +111,29 @@ def structure_user_input(state: WorkflowState) -> WorkflowState:
         state['error_node'] = "structure_input"
         print(f"❌ Error: {str(e)}")
         return state
+
+
+def parse_prestructured_input(raw_input: str) -> Optional[Dict[str, Any]]:
+    """
+    Recognize raw input that is already in the structured JSON format.
+    
+    Args:
+        raw_input: Raw user input
+        
+    Returns:
+        Dict with 'post_metadata' and 'event_details' objects, or None if the
+        input needs to be structured by the LLM
+    """
+    if not raw_input or not raw_input.lstrip().startswith('{'):
+        return None
+    
+    try:
+        data = orjson.loads(raw_input)
+    except orjson.JSONDecodeError:
+        return None
+    
+    if (isinstance(data, dict)
+            and isinstance(data.get('post_metadata'), dict)
+            and isinstance(data.get('event_details'), dict)):
+        return data
+    return None
@@ -3,21 +3,54 @@ Update Persona Node - Final Stage: Automatically updates persona.json with new i
 Intelligently parses user's post content and updates relevant sections of the persona file.
 """
 
-import json
+import functools
+import glob
 import os
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from pathlib import Path
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
-import sys
-sys.path.append('..')
+import orjson
+from langchain_core.messages import HumanMessage
 from state import WorkflowState
-from credentials_loader import get_persona_path
-from .utils import parse_llm_json_response
+from credentials_loader import get_persona_path, write_bytes_atomic
+from .utils import get_llm, parse_llm_json_response
 
-load_dotenv()
+# Number of timestamped persona backups to keep around
+PERSONA_BACKUP_KEEP = 10
+
+# Event details that can carry new persona information
+PERSONA_SIGNAL_FIELDS = ('tools_skills', 'outcome', 'learnings', 'role', 'challenges', 'acknowledgements', 'clarifications')
+
+# Event types that never update the persona
+PERSONA_SKIP_EVENT_TYPES = frozenset({'opinion', 'musing'})
+
+# How each extracted section is merged into the persona:
+# (path in the updates, path of the persona list, dedup mode, stamp added_date).
+# Dedup mode is 'title' for titled items, 'text' for plain strings, None to always add.
+# Goals are merged separately since they may be a dict of goal fields.
+SECTION_SPECS = (
+    (('achievements',), ('background', 'achievements'), 'title', False),
+    (('experiences',), ('background', 'recent_projects'), None, True),
+    (('skills', 'technical_skills'), ('skills_expertise', 'technical_skills'), 'text', False),
+    (('skills', 'soft_skills'), ('skills_expertise', 'soft_skills'), 'text', False),
+    (('education',), ('background', 'education'), None, False),
+    (('interests',), ('interests',), 'text', False),
+    (('values',), ('professional_goals', 'values'), 'text', False),
+    (('network_updates', 'new_communities'), ('network_context', 'industry_communities'), 'text', False),
+)
+
+# System prompt for extracting persona updates, kept terse to cut input tokens
+PERSONA_EXTRACTION_PROMPT = """You maintain a professional persona. From the user's activity, extract only NEW information showing professional growth.
+
+Sections: achievements (awards, wins, certifications), experiences (projects, roles, collaborations), skills (technical/soft), education (courses, degrees, training), interests, values, goals, network_updates (new communities).
+
+Rules: no duplicates of existing persona items; be specific and concrete; include dates and measurable results when given; be conservative.
+
+Return JSON with every section key; null when nothing new. Shape:
+{"achievements":[{"title":"","organization":"","date":"YYYY-MM","description":""}],
+"experiences":[{"type":"project","title":"","date":"YYYY-MM","description":"","impact":"","technologies":[]}],
+"skills":{"technical_skills":[],"soft_skills":[]},
+"education":null,"interests":null,"values":null,"goals":null,"network_updates":{"new_communities":[]}}"""
 
 
 def update_persona_from_post(state: WorkflowState) -> WorkflowState:
@@ -41,83 +74,28 @@ def update_persona_from_post(state: WorkflowState) -> WorkflowState:
             print("⏭️ Skipping persona update (post not saved successfully)")
             return state
         
-        # Load current persona using credentials_loader
-        persona_path = get_persona_path()
-        with open(persona_path, 'r', encoding='utf-8') as f:
-            current_persona = json.load(f)
-        
-        # Initialize Gemini Flash
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.3,  # Lower temperature for precise extraction
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
-        
         # Get the user's original input and structured data
         raw_input = state.get('raw_input', '')
         post_metadata = state.get('post_metadata', {})
         event_details = state.get('event_details', {})
         
-        # Create comprehensive analysis prompt
-        system_prompt = f"""You are a persona management expert that analyzes user content and extracts valuable information to update their professional persona.
-
-        Your task is to analyze the user's input about their professional activities and identify new information that should be added to their persona file.
-
-        PERSONA SECTIONS TO CONSIDER UPDATING:
-
-        1. **ACHIEVEMENTS** - Awards, recognitions, competitions won, certifications earned
-        2. **EXPERIENCES** - New projects, roles, responsibilities, collaborations
-        3. **SKILLS** - New technical skills, tools, technologies, soft skills learned
-        4. **EDUCATION** - Courses completed, degrees, training programs
-        5. **INTERESTS** - New professional interests or focus areas discovered
-        6. **VALUES** - New values or principles demonstrated through actions
-        7. **GOALS** - Updated career goals or aspirations mentioned
-        8. **NETWORK** - New types of people or communities engaged with
-
-        EXTRACTION RULES:
-        - Only extract information that is NEW or represents GROWTH/CHANGE
-        - Don't duplicate existing information
-        - Be specific and concrete - avoid generic descriptions  
-        - Focus on professional development and career-relevant information
-        - Include dates when mentioned
-        - Extract measurable results and impacts when available
-
-        OUTPUT FORMAT:
-        Return a JSON object with updates for each relevant section. Use null for sections with no new information.
-
-        Example structure:
-        {{
-            "achievements": [
-                {{
-                    "title": "Hackathon Winner",
-                    "organization": "TechCorp",
-                    "date": "2025-08",
-                    "description": "Won first place in AI/ML category"
-                }}
-            ],
-            "experiences": [
-                {{
-                    "type": "project",
-                    "title": "ML Prediction Model",
-                    "date": "2025-08",
-                    "description": "Improved prediction accuracy by 23% using TensorFlow",
-                    "impact": "23% accuracy improvement",
-                    "technologies": ["TensorFlow", "AWS"]
-                }}
-            ],
-            "skills": {{
-                "technical_skills": ["New Technology", "Tool Name"],
-                "soft_skills": ["Leadership", "Public Speaking"]
-            }},
-            "education": null,
-            "interests": null,
-            "values": null,
-            "goals": null,
-            "network_updates": null
-        }}
-
-        Be conservative - only add information that clearly represents new professional development."""
-
+        # Don't spend an LLM call on posts that can't carry anything new
+        has_signal = bool(raw_input.strip()) or any(event_details.get(field) for field in PERSONA_SIGNAL_FIELDS)
+        if not has_signal or post_metadata.get('event_type') in PERSONA_SKIP_EVENT_TYPES:
+            print("\n📋 Nothing in this post to add to persona")
+            state['persona_updated'] = False
+            state['persona_updates'] = {}
+            return state
+        
+        # The prompt uses the persona already loaded into the state; updates are
+        # applied to the file's current contents
+        persona_path = get_persona_path()
+        backup_bytes = Path(persona_path).read_bytes()
+        prompt_persona = state.get('persona_data') or orjson.loads(backup_bytes)
+        
+        # Gemini Flash in JSON mode, with a lower temperature for precise extraction
+        llm = get_llm(0.3, json_mode=True)
+        
         # Prepare analysis context
         analysis_context = {
             "raw_user_input": raw_input,
@@ -129,35 +107,30 @@ def update_persona_from_post(state: WorkflowState) -> WorkflowState:
                 "challenges": event_details.get('challenges'),
                 "learnings": event_details.get('learnings'),
                 "outcome": event_details.get('outcome'),
-                "acknowledgements": event_details.get('acknowledgements', [])
+                "acknowledgements": event_details.get('acknowledgements', []),
+                "clarifications": event_details.get('clarifications', [])
             },
             "current_persona_sections": {
-                "existing_skills": current_persona.get('skills_expertise', {}).get('technical_skills', []),
-                "existing_achievements": [exp.get('title', '') for exp in current_persona.get('background', {}).get('achievements', [])],
-                "current_interests": current_persona.get('interests', [])
+                "existing_skills": prompt_persona.get('skills_expertise', {}).get('technical_skills', []),
+                "existing_achievements": [exp.get('title', '') for exp in prompt_persona.get('background', {}).get('achievements', [])],
+                "current_interests": prompt_persona.get('interests', [])
             }
         }
 
-        user_message = f"""Analyze this professional activity and extract new information for persona updates:
-
-        USER INPUT:
-        {raw_input}
+        user_message = f"""Extract new persona information from this professional activity.
 
-        STRUCTURED EVENT DATA:
-        {json.dumps(analysis_context['event_details'], indent=2)}
+USER INPUT:
+{raw_input}
 
-        EVENT TYPE: {analysis_context['event_type']}
+EVENT ({analysis_context['event_type']}):
+{_compact_json(analysis_context['event_details'])}
 
-        CURRENT PERSONA CONTEXT (to avoid duplicates):
-        {json.dumps(analysis_context['current_persona_sections'], indent=2)}
+ALREADY IN PERSONA (don't repeat):
+{_compact_json(analysis_context['current_persona_sections'])}"""
 
-        Extract only genuinely NEW information that represents professional growth or development.
-        Return the extraction results in the specified JSON format."""
-
-        # Get extraction results
+        # Get extraction results, sending the static instructions and the activity as one message
         messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message)
+            HumanMessage(content=f"{PERSONA_EXTRACTION_PROMPT}\n\n---\n{user_message}")
         ]
 
         print("🔍 Analyzing content for persona updates...")
@@ -176,21 +149,21 @@ def update_persona_from_post(state: WorkflowState) -> WorkflowState:
         }
         extracted_updates = parse_llm_json_response(response.content, fallback_updates)
 
+        # The file's original bytes double as the backup, so the old persona isn't re-serialized
+        current_persona = orjson.loads(backup_bytes)
+        
         # Apply updates to persona
-        updated_persona = apply_persona_updates(current_persona, extracted_updates)
+        updated_persona, changes_made = apply_persona_updates(current_persona, extracted_updates)
         
         # Save updated persona if there were changes
-        changes_made = has_persona_changes(current_persona, updated_persona)
-        
         if changes_made:
-            # Create backup of current persona
+            # Write the backup first; the persona file is only replaced once it exists
             backup_path = f"{persona_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            with open(backup_path, 'w') as f:
-                json.dump(current_persona, f, indent=2)
+            write_bytes_atomic(backup_path, backup_bytes)
             
             # Save updated persona
-            with open(persona_path, 'w') as f:
-                json.dump(updated_persona, f, indent=2)
+            write_bytes_atomic(persona_path, orjson.dumps(updated_persona, option=orjson.OPT_INDENT_2))
+            prune_persona_backups(persona_path)
             
             # Track updates in state
             state['persona_updated'] = True
@@ -221,101 +194,47 @@ def update_persona_from_post(state: WorkflowState) -> WorkflowState:
         return state
 
 
-def apply_persona_updates(current_persona: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+def apply_persona_updates(current_persona: Dict[str, Any], updates: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
     """
-    Apply the extracted updates to the persona structure.
+    Apply the extracted updates to the persona structure, modifying it in place.
     
     Args:
         current_persona: Current persona data
         updates: New information to add
         
     Returns:
-        Updated persona data
+        Tuple of (updated persona data, whether anything was added or changed)
     """
-    updated_persona = current_persona.copy()
+    updated_persona = current_persona
+    changed = False
+    today = datetime.now().strftime('%Y-%m-%d')
     
-    # Update achievements
-    if updates.get('achievements'):
-        if 'background' not in updated_persona:
-            updated_persona['background'] = {}
-        if 'achievements' not in updated_persona['background']:
-            updated_persona['background']['achievements'] = []
-        
-        for achievement in updates['achievements']:
-            # Check if achievement already exists
-            existing_titles = [a.get('title', '').lower() for a in updated_persona['background']['achievements']]
-            if achievement['title'].lower() not in existing_titles:
-                updated_persona['background']['achievements'].append(achievement)
-
-    # Update experiences
-    if updates.get('experiences'):
-        if 'background' not in updated_persona:
-            updated_persona['background'] = {}
-        if 'recent_projects' not in updated_persona['background']:
-            updated_persona['background']['recent_projects'] = []
-        
-        for experience in updates['experiences']:
-            # Add with timestamp to avoid duplicates
-            experience['added_date'] = datetime.now().strftime('%Y-%m-%d')
-            updated_persona['background']['recent_projects'].append(experience)
-
-    # Update skills
-    if updates.get('skills'):
-        if 'skills_expertise' not in updated_persona:
-            updated_persona['skills_expertise'] = {'technical_skills': [], 'soft_skills': []}
+    for source_path, target_path, dedup, stamp_date in SECTION_SPECS:
+        # Find the new items for this section, accepting a single item or a list
+        items = functools.reduce(lambda d, k: d.get(k) if isinstance(d, dict) else None, source_path, updates)
+        if not items:
+            continue
+        if not isinstance(items, list):
+            items = [items]
         
-        # Add technical skills
-        if updates['skills'].get('technical_skills'):
-            existing_tech = [s.lower() for s in updated_persona['skills_expertise'].get('technical_skills', [])]
-            for skill in updates['skills']['technical_skills']:
-                if skill.lower() not in existing_tech:
-                    updated_persona['skills_expertise']['technical_skills'].append(skill)
+        # Find (or create) the persona list the items belong in
+        parent = functools.reduce(lambda d, k: d.setdefault(k, {}), target_path[:-1], updated_persona)
+        target = parent.setdefault(target_path[-1], [])
+        seen = {_dedup_key(existing, dedup) for existing in target} if dedup else None
         
-        # Add soft skills
-        if updates['skills'].get('soft_skills'):
-            existing_soft = [s.lower() for s in updated_persona['skills_expertise'].get('soft_skills', [])]
-            for skill in updates['skills']['soft_skills']:
-                if skill.lower() not in existing_soft:
-                    updated_persona['skills_expertise']['soft_skills'].append(skill)
-
-    # Update education
-    if updates.get('education'):
-        if 'background' not in updated_persona:
-            updated_persona['background'] = {}
-        if 'education' not in updated_persona['background']:
-            updated_persona['background']['education'] = []
-        
-        # Handle both list and dict formats
-        education_items = updates['education'] if isinstance(updates['education'], list) else [updates['education']]
-        for edu in education_items:
-            if edu:  # Skip None/empty items
-                updated_persona['background']['education'].append(edu)
-
-    # Update interests
-    if updates.get('interests'):
-        if 'interests' not in updated_persona:
-            updated_persona['interests'] = []
-        
-        # Handle both list and string formats
-        interest_items = updates['interests'] if isinstance(updates['interests'], list) else [updates['interests']]
-        existing_interests = [i.lower() for i in updated_persona['interests']]
-        for interest in interest_items:
-            if interest and interest.lower() not in existing_interests:
-                updated_persona['interests'].append(interest)
-
-    # Update values
-    if updates.get('values'):
-        if 'professional_goals' not in updated_persona:
-            updated_persona['professional_goals'] = {}
-        if 'values' not in updated_persona['professional_goals']:
-            updated_persona['professional_goals']['values'] = []
-        
-        # Handle both list and string formats
-        value_items = updates['values'] if isinstance(updates['values'], list) else [updates['values']]
-        existing_values = [v.lower() for v in updated_persona['professional_goals']['values']]
-        for value in value_items:
-            if value and value.lower() not in existing_values:
-                updated_persona['professional_goals']['values'].append(value)
+        for item in items:
+            if not item:  # Skip None/empty items
+                continue
+            if dedup:
+                key = _dedup_key(item, dedup)
+                if key in seen:
+                    continue
+                seen.add(key)
+            if stamp_date and isinstance(item, dict):
+                # Add with timestamp to avoid duplicates
+                item['added_date'] = today
+            target.append(item)
+            changed = True
 
     # Update goals
     if updates.get('goals'):
@@ -325,7 +244,9 @@ def apply_persona_updates(current_persona: Dict[str, Any], updates: Dict[str, An
         # Handle both dict and list formats
         if isinstance(updates['goals'], dict):
             for goal_type, goal_value in updates['goals'].items():
-                updated_persona['professional_goals'][goal_type] = goal_value
+                if updated_persona['professional_goals'].get(goal_type) != goal_value:
+                    updated_persona['professional_goals'][goal_type] = goal_value
+                    changed = True
         elif isinstance(updates['goals'], list):
             # If it's a list, add them as a goals list
             if 'goals' not in updated_persona['professional_goals']:
@@ -333,33 +254,25 @@ def apply_persona_updates(current_persona: Dict[str, Any], updates: Dict[str, An
             for goal in updates['goals']:
                 if goal and goal not in updated_persona['professional_goals']['goals']:
                     updated_persona['professional_goals']['goals'].append(goal)
+                    changed = True
 
-    # Update network information
-    if updates.get('network_updates'):
-        if 'network_context' not in updated_persona:
-            updated_persona['network_context'] = {'target_audience': [], 'industry_communities': []}
-        
-        if updates['network_updates'].get('new_communities'):
-            existing_communities = [c.lower() for c in updated_persona['network_context'].get('industry_communities', [])]
-            for community in updates['network_updates']['new_communities']:
-                if community.lower() not in existing_communities:
-                    updated_persona['network_context']['industry_communities'].append(community)
-
-    return updated_persona
+    return updated_persona, changed
 
 
-def has_persona_changes(original: Dict[str, Any], updated: Dict[str, Any]) -> bool:
+def _dedup_key(item: Any, dedup: str) -> str:
     """
-    Check if there are actual changes between original and updated persona.
+    Get the case-insensitive key used to spot duplicate persona items.
     
     Args:
-        original: Original persona data
-        updated: Updated persona data
+        item: Persona list item (a string, or a dict for titled items)
+        dedup: 'title' to compare dict titles, 'text' to compare the items themselves
         
     Returns:
-        True if changes were made, False otherwise
+        Lowercased comparison key
     """
-    return json.dumps(original, sort_keys=True) != json.dumps(updated, sort_keys=True)
+    if dedup == 'title':
+        return str(item.get('title', '') if isinstance(item, dict) else item).lower()
+    return str(item).lower()
 
 
 def generate_update_summary(updates: Dict[str, Any]) -> Dict[str, List]:
@@ -414,14 +327,47 @@ def rollback_persona_update(backup_path: str, persona_path: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        if os.path.exists(backup_path):
-            with open(backup_path, 'r') as f:
-                backup_data = json.load(f)
-            
-            with open(persona_path, 'w') as f:
-                json.dump(backup_data, f, indent=2)
-            
-            return True
-        return False
-    except Exception:
+        backup_data = orjson.loads(Path(backup_path).read_bytes())
+        write_bytes_atomic(persona_path, orjson.dumps(backup_data, option=orjson.OPT_INDENT_2))
+        
+        return True
+    except Exception:  # includes a missing backup file
         return False
+
+
+def prune_persona_backups(persona_path: str, keep: int = PERSONA_BACKUP_KEEP) -> int:
+    """
+    Delete all but the most recent persona backups.
+    
+    Args:
+        persona_path: Path to the persona file whose backups should be pruned
+        keep: Number of most recent backups to keep
+        
+    Returns:
+        Number of backups deleted
+    """
+    # Backup suffixes are YYYYMMDD_HHMMSS timestamps, so name order is age order
+    backups = sorted(glob.glob(f"{glob.escape(persona_path)}.backup_*"))
+    stale = backups[:-keep] if keep > 0 else backups
+    
+    removed = 0
+    for backup in stale:
+        try:
+            os.unlink(backup)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _compact_json(data: Any) -> str:
+    """
+    Serialize data as compact JSON for embedding in a prompt.
+    
+    Args:
+        data: JSON-serializable data
+        
+    Returns:
+        JSON text without indentation or extra whitespace
+    """
+    return orjson.dumps(data).decode()
@@ -2,16 +2,31 @@
 User Approval Node - Handles user review and feedback for post revisions.
 """
 
-import os
+import string
 from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
 import sys
-sys.path.append('..')
 from state import WorkflowState
+from .utils import cached_invoke, get_llm
 
-load_dotenv()
+# Token cap for a revised post (a LinkedIn post runs a few hundred tokens)
+REVISION_MAX_OUTPUT_TOKENS = 800
+
+# System prompt for revising a post from user feedback
+REVISION_SYSTEM_PROMPT = """You are an expert LinkedIn post editor.
+Your task is to revise the given post based on specific user feedback.
+
+REVISION GUIDELINES:
+1. Make only the changes requested by the user
+2. Preserve the overall structure and tone unless specifically asked to change
+3. Maintain the same persona and writing style
+4. Keep all good elements that the user didn't ask to change
+5. Ensure the revised post flows naturally
+
+Output only the revised post text, nothing else."""
+
+# Characters trimmed from both ends of revision feedback before caching
+_FEEDBACK_TRIM_CHARS = string.punctuation + string.whitespace
 
 
 def get_user_approval(state: WorkflowState) -> WorkflowState:
@@ -24,27 +39,30 @@ def get_user_approval(state: WorkflowState) -> WorkflowState:
     Returns:
         Updated state with approval status or revision feedback
     """
-    print("\n" + "="*60)
-    print("📝 POST REVIEW & APPROVAL")
-    print("="*60)
+    header = f"\n{'='*60}\n📝 POST REVIEW & APPROVAL\n{'='*60}\n"
     
     try:
         # Check for errors
         if state.get('error'):
+            sys.stdout.write(header)
+            sys.stdout.flush()
             return state
         
-        # Display the draft post
-        print("\nHere's your generated LinkedIn post:\n")
-        print("-"*40)
-        print(state['draft_post'])
-        print("-"*40)
-        
-        # Get user feedback
-        print("\n🔍 Review Options:")
-        print("1. Approve - Post looks great, schedule it!")
-        print("2. Revise - I'd like to make some changes")
-        print("3. Regenerate - Start over with a completely new version")
-        print("4. Cancel - Exit without saving")
+        # Display the draft post and review options in a single write
+        ui = (
+            f"{header}"
+            f"\nHere's your generated LinkedIn post:\n\n"
+            f"{'-'*40}\n"
+            f"{state['draft_post']}\n"
+            f"{'-'*40}\n"
+            f"\n🔍 Review Options:\n"
+            f"1. Approve - Post looks great, schedule it!\n"
+            f"2. Revise - I'd like to make some changes\n"
+            f"3. Regenerate - Start over with a completely new version\n"
+            f"4. Cancel - Exit without saving\n"
+        )
+        sys.stdout.write(ui)
+        sys.stdout.flush()
         
         choice = input("\nYour choice (1-4): ").strip()
         
@@ -121,24 +139,7 @@ def revise_post(state: WorkflowState, feedback: str) -> WorkflowState:
     """
     try:
         # Initialize Gemini Flash
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.6,
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
-        
-        # Create revision prompt
-        system_prompt = """You are an expert LinkedIn post editor. 
-        Your task is to revise the given post based on specific user feedback.
-        
-        REVISION GUIDELINES:
-        1. Make only the changes requested by the user
-        2. Preserve the overall structure and tone unless specifically asked to change
-        3. Maintain the same persona and writing style
-        4. Keep all good elements that the user didn't ask to change
-        5. Ensure the revised post flows naturally
-        
-        Output only the revised post text, nothing else."""
+        llm = get_llm(0.6, max_output_tokens=REVISION_MAX_OUTPUT_TOKENS)
         
         user_message = f"""Original LinkedIn Post:
         {state['draft_post']}
@@ -150,12 +151,21 @@ def revise_post(state: WorkflowState, feedback: str) -> WorkflowState:
         
         # Get revision
         messages = [
-            SystemMessage(content=system_prompt),
+            SystemMessage(content=REVISION_SYSTEM_PROMPT),
             HumanMessage(content=user_message)
         ]
         
         print("\n🔄 Revising post based on your feedback...")
-        response = llm.invoke(messages)
+        
+        # In the CLI, show the revision as it is written instead of waiting for all of it
+        on_chunk = None
+        if not state.get('gradio_mode'):
+            print("-"*40)
+            on_chunk = _write_chunk
+        
+        response = cached_invoke(llm, messages, cache_key=revision_cache_key(state['draft_post'], feedback), on_chunk=on_chunk)
+        if on_chunk:
+            print("\n" + "-"*40)
         
         # Update draft with revision
         state['draft_post'] = response.content.strip()
@@ -168,3 +178,28 @@ def revise_post(state: WorkflowState, feedback: str) -> WorkflowState:
         print(f"⚠️ Error revising post: {str(e)}")
         print("Keeping original version.")
         return state
+
+
+def revision_cache_key(draft_post: str, feedback: str) -> str:
+    """
+    Build a cache key for a revision that ignores incidental formatting in the feedback.
+    
+    Only case, runs of whitespace and punctuation around the feedback are
+    normalized, so "Make it shorter!" and "make it  shorter" for the same draft
+    share a cached revision while any difference in wording does not.
+    
+    Args:
+        draft_post: Post being revised
+        feedback: User's revision feedback
+        
+    Returns:
+        Cache key for the revision request
+    """
+    normalized = ' '.join(feedback.lower().split()).strip(_FEEDBACK_TRIM_CHARS)
+    return f"revise\n{draft_post}\n{normalized}"
+
+
+def _write_chunk(text: str) -> None:
+    """Print a piece of streamed LLM output immediately."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
@@ -2,9 +2,134 @@
 Utility functions for nodes - common functionality used across multiple nodes.
 """
 
+import functools
+import hashlib
 import json
+import os
 import re
-from typing import Any, Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import orjson
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_google_genai import ChatGoogleGenerativeAI
+from .config import settings
+
+# Gemini model used by every LLM stage
+GEMINI_MODEL = "gemini-2.0-flash-exp"
+
+# Tokens fixed up in LLM JSON, matched in one scan: double-quoted strings (kept
+# as-is so their contents are never touched), single-quoted strings, trailing
+# commas before a closing brace/bracket, and Python literals
+_RE_JSON_FIXUP = re.compile(r"""("(?:[^"\\]|\\.)*")|'([^'\\]*)'|,(\s*[}\]])|\b(True|False|None)\b""")
+
+# JSON spellings of the Python literals LLMs sometimes emit
+_PY_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+# Cached LLM responses: request hash -> (expiry time, response text), oldest first
+LLM_CACHE_MAX_ENTRIES = 128
+LLM_CACHE_TTL_SECONDS = 3600
+_LLM_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_LLM_CACHE_LOCK = threading.Lock()
+
+# Minimum text lengths for quick_validate to treat a critical field as meaningful
+QUICK_VALIDATE_MIN_CHARS = {'description': 40, 'role': 10}
+QUICK_VALIDATE_MIN_CHARS_INSIGHT = 20  # for learnings or outcome
+
+# Parsed persona files keyed by path, tagged with the (mtime, size) they were read at
+_PERSONA_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+
+@functools.lru_cache(maxsize=8)
+def get_llm(temperature: float, json_mode: bool = False,
+            max_output_tokens: Optional[int] = None) -> ChatGoogleGenerativeAI:
+    """
+    Get a shared Gemini Flash client for the given settings.
+    
+    Clients are created once per configuration and reused across calls, so the
+    underlying HTTP connection stays open between LLM stages instead of being
+    set up again on every invocation.
+    
+    Args:
+        temperature: Sampling temperature for the model
+        json_mode: Ask Gemini to respond with a bare JSON document
+        max_output_tokens: Cap on generated tokens for calls with bounded output
+                           (None leaves the model default)
+        
+    Returns:
+        Configured ChatGoogleGenerativeAI instance
+    """
+    extra_kwargs = {"response_mime_type": "application/json"} if json_mode else {}
+    if max_output_tokens is not None:
+        extra_kwargs["max_output_tokens"] = max_output_tokens
+    return ChatGoogleGenerativeAI(
+        model=GEMINI_MODEL,
+        temperature=temperature,
+        google_api_key=settings().google_api_key,
+        **extra_kwargs
+    )
+
+
+def cached_invoke(llm: ChatGoogleGenerativeAI, messages: List[BaseMessage], ttl: float = LLM_CACHE_TTL_SECONDS,
+                  cache_key: Optional[str] = None, on_chunk: Optional[Callable[[str], None]] = None) -> BaseMessage:
+    """
+    Invoke the LLM, reusing the response to an identical earlier request.
+    
+    Requests are identified by the model settings and the full message list,
+    so repeating a revision or validation with the same inputs is answered
+    from memory instead of another API round trip.
+    
+    Args:
+        llm: Gemini client to call on a cache miss
+        messages: Messages to send
+        ttl: Seconds a cached response stays valid
+        cache_key: Identifies the request instead of the messages, letting
+                   callers treat differently worded but equivalent requests as one
+        on_chunk: Called with each piece of text as the response streams in
+                  (or once with the whole cached response)
+        
+    Returns:
+        The model's response message
+    """
+    request = cache_key if cache_key is not None else [[message.type, message.content] for message in messages]
+    key = hashlib.sha256(orjson.dumps([
+        llm.model,
+        llm.temperature,
+        getattr(llm, 'response_mime_type', None),
+        getattr(llm, 'max_output_tokens', None),
+        request
+    ])).hexdigest()
+    
+    cached_text = None
+    with _LLM_CACHE_LOCK:
+        cached = _LLM_CACHE.get(key)
+        if cached and cached[0] > time.monotonic():
+            _LLM_CACHE.move_to_end(key)
+            cached_text = cached[1]
+    
+    # Output happens outside the lock so other threads' lookups aren't held up
+    if cached_text is not None:
+        if on_chunk:
+            on_chunk(cached_text)
+        return AIMessage(content=cached_text)
+    
+    if on_chunk:
+        pieces = []
+        for chunk in llm.stream(messages):
+            on_chunk(chunk.content)
+            pieces.append(chunk.content)
+        response = AIMessage(content="".join(pieces))
+    else:
+        response = llm.invoke(messages)
+    
+    with _LLM_CACHE_LOCK:
+        _LLM_CACHE[key] = (time.monotonic() + ttl, response.content)
+        _LLM_CACHE.move_to_end(key)
+        while len(_LLM_CACHE) > LLM_CACHE_MAX_ENTRIES:
+            _LLM_CACHE.popitem(last=False)
+    
+    return response
 
 
 def parse_llm_json_response(response_text: str, fallback_value: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -24,32 +149,12 @@ def parse_llm_json_response(response_text: str, fallback_value: Optional[Dict[st
     if fallback_value is None:
         fallback_value = {}
     
-    # Clean up the response text
-    cleaned_text = response_text.strip()
-    
-    # Remove markdown code blocks if present
-    if "```json" in cleaned_text:
-        # Extract content between ```json and ```
-        json_match = re.search(r'```json\s*\n?(.*?)\n?```', cleaned_text, re.DOTALL)
-        if json_match:
-            cleaned_text = json_match.group(1).strip()
-    elif "```" in cleaned_text:
-        # Extract content between ``` blocks
-        json_match = re.search(r'```\s*\n?(.*?)\n?```', cleaned_text, re.DOTALL)
-        if json_match:
-            cleaned_text = json_match.group(1).strip()
-    
-    # Remove any leading/trailing text that isn't JSON
-    # Look for the first { and last }
-    first_brace = cleaned_text.find('{')
-    last_brace = cleaned_text.rfind('}')
-    
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-        cleaned_text = cleaned_text[first_brace:last_brace + 1]
-    
-    # Try to parse the cleaned JSON
+    # Pull the outermost JSON object out of any markdown fences or surrounding prose
+    cleaned_text = _extract_json_span(response_text.strip())
+    
+    # Try to parse the cleaned JSON (orjson's error subclasses json.JSONDecodeError)
     try:
-        return json.loads(cleaned_text)
+        return orjson.loads(cleaned_text)
     except json.JSONDecodeError as e:
         # Try some common fixes
         try:
@@ -66,6 +171,64 @@ def parse_llm_json_response(response_text: str, fallback_value: Optional[Dict[st
                 raise e
 
 
+def _extract_json_span(text: str) -> str:
+    """
+    Find the outermost JSON object in text with a single scan.
+    
+    Braces inside JSON strings are ignored, so the object is matched correctly
+    even when its values contain braces or it is wrapped in code fences.
+    
+    Args:
+        text: Text that may contain a JSON object
+        
+    Returns:
+        The JSON object text, everything from its opening brace if it is never
+        closed, or the original text if there is no object
+    """
+    start = -1
+    depth = 0
+    in_string = False
+    escape = False
+    
+    for i, char in enumerate(text):
+        if depth == 0:
+            if char == '{':
+                start = i
+                depth = 1
+            continue
+        
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    
+    return text[start:] if start != -1 else text
+
+
+def dumps_pretty(data: Any) -> str:
+    """
+    Serialize data as indented JSON for embedding in a prompt.
+    
+    Args:
+        data: JSON-serializable data
+        
+    Returns:
+        JSON text indented by two spaces
+    """
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+
+
 def fix_common_json_issues(json_text: str) -> str:
     """
     Fix common JSON formatting issues that LLMs sometimes produce.
@@ -76,20 +239,27 @@ def fix_common_json_issues(json_text: str) -> str:
     Returns:
         Fixed JSON string
     """
-    # Remove trailing commas before closing braces/brackets
-    json_text = re.sub(r',(\s*[}\]])', r'\1', json_text)
-    
-    # Replace single quotes with double quotes (but not inside strings)
-    # This is a simple approach - more complex scenarios might need a proper parser
-    json_text = re.sub(r"'([^']*)':", r'"\1":', json_text)  # Keys
-    json_text = re.sub(r":\s*'([^']*)'", r': "\1"', json_text)  # String values
-    
-    # Fix common boolean/null values
-    json_text = re.sub(r'\bTrue\b', 'true', json_text)
-    json_text = re.sub(r'\bFalse\b', 'false', json_text)
-    json_text = re.sub(r'\bNone\b', 'null', json_text)
+    return _RE_JSON_FIXUP.sub(_sanitize_json_token, json_text)
+
+
+def _sanitize_json_token(match: re.Match) -> str:
+    """
+    Rewrite one token matched by _RE_JSON_FIXUP into valid JSON.
     
-    return json_text
+    Args:
+        match: Match for a string, trailing comma or Python literal
+        
+    Returns:
+        Replacement text for the token
+    """
+    double_quoted, single_quoted, after_comma, literal = match.groups()
+    if double_quoted is not None:
+        return double_quoted
+    if single_quoted is not None:
+        return '"' + single_quoted.replace('"', '\\"') + '"'
+    if after_comma is not None:
+        return after_comma
+    return _PY_LITERALS[literal]
 
 
 def safe_get_nested_value(data: Dict[str, Any], keys: str, default: Any = None) -> Any:
@@ -142,3 +312,62 @@ def validate_required_fields(data: Dict[str, Any], required_fields: list) -> tup
                 missing_fields.append(field)
     
     return len(missing_fields) == 0, missing_fields
+
+
+def quick_validate(event_details: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """
+    Check locally whether event details clearly have enough substance for a post.
+    
+    This is deliberately conservative: it only reports complete when the
+    description and role are filled in with real text and there is a learning
+    or an outcome, so the LLM validator is still consulted for borderline input.
+    
+    Args:
+        event_details: Structured event details
+        
+    Returns:
+        Tuple of (is_complete, missing_fields)
+    """
+    _, missing_fields = validate_required_fields(event_details, ['description', 'role'])
+    
+    for field, min_chars in QUICK_VALIDATE_MIN_CHARS.items():
+        if field not in missing_fields and len(str(event_details.get(field) or '').strip()) < min_chars:
+            missing_fields.append(field)
+    
+    if not any(len(str(event_details.get(field) or '').strip()) >= QUICK_VALIDATE_MIN_CHARS_INSIGHT
+               for field in ('learnings', 'outcome')):
+        missing_fields.append('learnings')
+    
+    return len(missing_fields) == 0, missing_fields
+
+
+def load_persona(persona_path: str) -> Dict[str, Any]:
+    """
+    Load and parse a persona JSON file, reusing the parsed result while the file is unchanged.
+    
+    The cache is keyed on the file's modification time and size, so edits made
+    by the persona auto-update (or by hand) are picked up on the next call.
+    
+    Args:
+        persona_path: Path to the persona JSON file
+        
+    Returns:
+        Parsed persona dictionary
+        
+    Raises:
+        FileNotFoundError: If the persona file does not exist
+        json.JSONDecodeError: If the persona file contains invalid JSON
+    """
+    st = os.stat(persona_path)
+    signature = (st.st_mtime_ns, st.st_size)
+    
+    cached = _PERSONA_CACHE.get(persona_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    
+    with open(persona_path, 'rb') as f:
+        persona_data = orjson.loads(f.read())
+    
+    _PERSONA_CACHE[persona_path] = (signature, persona_data)
+    return persona_data
+
@@ -3,17 +3,51 @@ Validate Completeness Node - LLM Stage 2: Checks if enough information is presen
 """
 
 import json
-import os
-from typing import Dict, Any, List
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, Any, List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
-from dotenv import load_dotenv
-import sys
-sys.path.append('..')
 from state import WorkflowState
-from .utils import parse_llm_json_response
+from .utils import cached_invoke, dumps_pretty, get_llm, parse_llm_json_response, quick_validate
 
-load_dotenv()
+# Token cap for the validation reply (a small JSON verdict plus a few questions)
+VALIDATION_MAX_OUTPUT_TOKENS = 400
+
+# Shortest answer treated as real content rather than a skipped question
+MIN_ANSWER_CHARS = 3
+
+# System prompt for judging whether the structured data is complete enough for a post
+VALIDATION_SYSTEM_PROMPT = """You are an expert LinkedIn content validator.
+Review the structured post data and determine if it has enough information to create an authentic and engaging LinkedIn post.
+
+Critical fields that should have meaningful content:
+1. Description - Clear context of what happened
+2. Role - What the user specifically did
+3. Learnings OR Outcome - At least one should be present
+4. Tools/Skills - For technical posts
+
+Nice to have:
+- Challenges faced
+- Acknowledgements
+- Engagement question
+
+Analyze the data and:
+1. Determine if the post has enough substance (return "is_complete": true/false)
+2. If incomplete, generate 2-3 specific questions to gather missing critical information
+3. Questions should be conversational and specific to the context
+
+Output JSON format:
+{
+    "is_complete": boolean,
+    "missing_fields": ["field1", "field2"],
+    "clarifying_questions": ["question1", "question2", "question3"],
+    "validation_notes": "Brief explanation of what's missing"
+}"""
+
+# Stock clarifying questions for critical fields that are missing entirely
+_FIELD_QUESTIONS = {
+    "description": "Could you describe what happened? What was the project or event, and what was the context?",
+    "role": "What was your specific role? What did you personally do or contribute?",
+    "learnings": "What did you learn from this, or what came out of it (results, recognition, impact)?"
+}
 
 
 def validate_and_complete(state: WorkflowState) -> WorkflowState:
@@ -35,70 +69,52 @@ def validate_and_complete(state: WorkflowState) -> WorkflowState:
         if state.get('error'):
             return state
         
-        # Initialize Gemini Flash
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.5,
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
-        
-        # Create system prompt for validation
-        system_prompt = """You are an expert LinkedIn content validator.
-        Review the structured post data and determine if it has enough information to create an authentic and engaging LinkedIn post.
-        
-        Critical fields that should have meaningful content:
-        1. Description - Clear context of what happened
-        2. Role - What the user specifically did
-        3. Learnings OR Outcome - At least one should be present
-        4. Tools/Skills - For technical posts
-        
-        Nice to have:
-        - Challenges faced
-        - Acknowledgements
-        - Engagement question
-        
-        Analyze the data and:
-        1. Determine if the post has enough substance (return "is_complete": true/false)
-        2. If incomplete, generate 2-3 specific questions to gather missing critical information
-        3. Questions should be conversational and specific to the context
-        
-        Output JSON format:
-        {
-            "is_complete": boolean,
-            "missing_fields": ["field1", "field2"],
-            "clarifying_questions": ["question1", "question2", "question3"],
-            "validation_notes": "Brief explanation of what's missing"
-        }"""
-        
-        # Prepare current data for validation
-        current_data = {
-            "post_metadata": state.get('post_metadata', {}),
-            "event_details": state.get('event_details', {})
-        }
-        
-        user_message = f"""Please validate the completeness of this LinkedIn post data:
-        
-        {json.dumps(current_data, indent=2)}
-        
-        Check if there's enough information to create an authentic and engaging post."""
-        
-        # Get validation response
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message)
-        ]
-        
-        print("🔍 Analyzing content completeness...")
-        response = llm.invoke(messages)
+        # Skip the LLM when the details are obviously complete
+        event_details = state.get('event_details') or {}
+        is_complete, missing_fields = quick_validate(event_details)
+        if is_complete:
+            state['is_complete'] = True
+            state['missing_fields'] = []
+            state['clarifying_questions'] = []
+            print("✅ Content is complete and ready for post generation!")
+            return state
         
-        # Parse validation response using robust utility function
-        fallback_result = {
-            "is_complete": False,
-            "missing_fields": ["description", "role"],
-            "clarifying_questions": ["What was your specific role in this activity?", "What did you learn from this experience?"],
-            "validation_notes": "Insufficient information provided"
-        }
-        validation_result = parse_llm_json_response(response.content, fallback_result)
+        # Critical fields that are simply empty get stock questions; anything
+        # less clear-cut is judged by the LLM
+        validation_result = template_validation(event_details, missing_fields)
+        if validation_result is None:
+            # Gemini Flash in JSON mode, so the verdict comes back as a bare JSON document
+            llm = get_llm(0.5, json_mode=True, max_output_tokens=VALIDATION_MAX_OUTPUT_TOKENS)
+            
+            # Prepare current data for validation
+            current_data = {
+                "post_metadata": state.get('post_metadata', {}),
+                "event_details": state.get('event_details', {})
+            }
+            
+            user_message = f"""Please validate the completeness of this LinkedIn post data:
+            
+            {dumps_pretty(current_data)}
+            
+            Check if there's enough information to create an authentic and engaging post."""
+            
+            # Get validation response
+            messages = [
+                SystemMessage(content=VALIDATION_SYSTEM_PROMPT),
+                HumanMessage(content=user_message)
+            ]
+            
+            print("🔍 Analyzing content completeness...")
+            response = cached_invoke(llm, messages)
+            
+            # Parse validation response using robust utility function
+            fallback_result = {
+                "is_complete": False,
+                "missing_fields": ["description", "role"],
+                "clarifying_questions": ["What was your specific role in this activity?", "What did you learn from this experience?"],
+                "validation_notes": "Insufficient information provided"
+            }
+            validation_result = parse_llm_json_response(response.content, fallback_result)
         
         # Update state with validation results
         state['is_complete'] = validation_result.get('is_complete', False)
@@ -113,13 +129,14 @@ def validate_and_complete(state: WorkflowState) -> WorkflowState:
         is_gradio_mode = state.get('gradio_mode', False)
         
         # If not complete, ask clarifying questions
-        print("\n⚠️ Additional information needed for a complete post.")
-        print(f"Missing fields: {', '.join(state['missing_fields'])}")
-        print("\nPlease answer these questions to enhance your post:\n")
-        
-        # Print questions for both modes
-        for i, question in enumerate(state['clarifying_questions'], 1):
-            print(f"{i}. {question}")
+        # Print the notice and questions for both modes in one write
+        questions = "\n".join(f"{i}. {q}" for i, q in enumerate(state['clarifying_questions'], 1))
+        print(
+            f"\n⚠️ Additional information needed for a complete post.\n"
+            f"Missing fields: {', '.join(state['missing_fields'])}\n"
+            f"\nPlease answer these questions to enhance your post:\n\n"
+            f"{questions}"
+        )
         
         # In Gradio mode, return early without asking for input
         if is_gradio_mode:
@@ -127,50 +144,18 @@ def validate_and_complete(state: WorkflowState) -> WorkflowState:
             return state
         
         # CLI mode: continue with interactive input
-        user_responses = {}
+        answers = {}
         for i, question in enumerate(state['clarifying_questions'], 1):
-            answer = input("   Your answer: ").strip()
-            user_responses[f"question_{i}"] = {
-                "question": question,
-                "answer": answer
-            }
+            answers[str(i)] = input("   Your answer: ")
         
+        user_responses = build_user_responses(state['clarifying_questions'], answers)
         state['user_responses'] = user_responses
         
         # Now merge the responses back into the structured data
-        if user_responses:
-            print("\n📝 Updating post data with your responses...")
-            
-            # Create prompt to merge responses
-            merge_prompt = """You are helping update LinkedIn post data with user's responses to clarifying questions.
-            
-            Take the user's responses and intelligently merge them into the appropriate fields in the event_details.
-            Don't overwrite existing good content, but enhance and complete it.
-            
-            Output the updated event_details JSON object only."""
-            
-            merge_message = f"""Current event details:
-            {json.dumps(state.get('event_details', {}), indent=2)}
-            
-            User responses to clarifying questions:
-            {json.dumps(user_responses, indent=2)}
-            
-            Please merge these responses into the event_details appropriately."""
-            
-            merge_messages = [
-                SystemMessage(content=merge_prompt),
-                HumanMessage(content=merge_message)
-            ]
-            
-            merge_response = llm.invoke(merge_messages)
-            
-            # Parse merged data using robust utility function
-            fallback_details = state.get('event_details', {})
-            updated_details = parse_llm_json_response(merge_response.content, fallback_details)
-            state['event_details'] = updated_details
+        if has_substantive_answer(user_responses):
+            state['event_details'] = merge_clarifications(state.get('event_details', {}), user_responses)
             state['is_complete'] = True
-            
-            print("✅ Post data updated successfully!")
+            print("\n✅ Post data updated with your responses!")
         
         return state
         
@@ -208,61 +193,16 @@ def integrate_clarification_answers(state: WorkflowState) -> WorkflowState:
             state['is_complete'] = True
             return state
         
-        # Initialize Gemini Flash for merging
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            temperature=0.5,
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
+        # Pair the answers with the original clarifying questions
+        user_responses = build_user_responses(state.get('clarifying_questions', []), clarification_answers)
         
-        # Get the original clarifying questions for context
-        original_questions = state.get('clarifying_questions', [])
-        
-        # Create user responses in the expected format
-        user_responses = {}
-        for answer_num, answer in clarification_answers.items():
-            if answer and answer.strip():
-                # Map answer number to question if available
-                question_index = int(answer_num) - 1
-                if 0 <= question_index < len(original_questions):
-                    user_responses[f"question_{answer_num}"] = {
-                        "question": original_questions[question_index],
-                        "answer": answer.strip()
-                    }
-                else:
-                    user_responses[f"question_{answer_num}"] = {
-                        "question": f"Question {answer_num}",
-                        "answer": answer.strip()
-                    }
-        
-        # Create prompt to merge responses
-        merge_prompt = """You are helping update LinkedIn post data with user's responses to clarifying questions.
-        
-        Take the user's responses and intelligently merge them into the appropriate fields in the event_details.
-        Don't overwrite existing good content, but enhance and complete it.
-        
-        Output the updated event_details JSON object only."""
-        
-        merge_message = f"""Current event details:
-        {json.dumps(state.get('event_details', {}), indent=2)}
-        
-        User responses to clarifying questions:
-        {json.dumps(user_responses, indent=2)}
-        
-        Please merge these responses into the event_details appropriately."""
-        
-        merge_messages = [
-            SystemMessage(content=merge_prompt),
-            HumanMessage(content=merge_message)
-        ]
-        
-        print("🔄 Merging answers with existing data...")
-        merge_response = llm.invoke(merge_messages)
+        if not has_substantive_answer(user_responses):
+            print("No substantive answers provided, continuing with existing data...")
+            state['is_complete'] = True
+            return state
         
-        # Parse merged data using robust utility function
-        fallback_details = state.get('event_details', {})
-        updated_details = parse_llm_json_response(merge_response.content, fallback_details)
-        state['event_details'] = updated_details
+        # Attach the answers to the event details for post generation
+        state['event_details'] = merge_clarifications(state.get('event_details', {}), user_responses)
         state['is_complete'] = True
         
         print("✅ Clarification answers integrated successfully!")
@@ -274,3 +214,101 @@ def integrate_clarification_answers(state: WorkflowState) -> WorkflowState:
         print(f"❌ Error: {str(e)}")
         return state
 
+
+def build_user_responses(questions: List[str], answers: Dict[Any, str]) -> Dict[str, Dict[str, str]]:
+    """
+    Pair numbered answers with the clarifying questions they respond to.
+    
+    Shared by the CLI prompt loop and the Gradio continuation so both paths
+    produce the same user_responses shape.
+    
+    Args:
+        questions: Clarifying questions in the order they were asked
+        answers: Answers keyed by 1-based question number (int or str)
+        
+    Returns:
+        Non-empty responses keyed as 'question_<n>', each with 'question' and 'answer'
+    """
+    user_responses = {}
+    for answer_num, answer in answers.items():
+        if not answer or not answer.strip():
+            continue
+        
+        # Map answer number to question if available
+        question_index = int(answer_num) - 1
+        if 0 <= question_index < len(questions):
+            question = questions[question_index]
+        else:
+            question = f"Question {answer_num}"
+        
+        user_responses[f"question_{answer_num}"] = {
+            "question": question,
+            "answer": answer.strip()
+        }
+    
+    return user_responses
+
+
+def has_substantive_answer(user_responses: Dict[str, Dict[str, str]]) -> bool:
+    """
+    Check whether any response says more than a placeholder like "-" or "na".
+    
+    Args:
+        user_responses: Responses built by build_user_responses
+        
+    Returns:
+        True if at least one answer is long enough to be worth merging
+    """
+    return any(len(response['answer']) >= MIN_ANSWER_CHARS for response in user_responses.values())
+
+
+def merge_clarifications(event_details: Dict[str, Any], user_responses: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Add the user's answers to clarifying questions to the event details.
+    
+    The answers are kept as question/answer pairs under 'clarifications' and
+    worked into the post by the generation stage, so no separate LLM call is
+    needed to fold them into the individual fields.
+    
+    Args:
+        event_details: Current event details
+        user_responses: Responses keyed by question, each with 'question' and 'answer'
+        
+    Returns:
+        Event details including the answered clarifications
+    """
+    clarifications = list(event_details.get('clarifications') or [])
+    for response in user_responses.values():
+        answer = (response.get('answer') or '').strip()
+        if answer:
+            clarifications.append({"question": response.get('question', ''), "answer": answer})
+    
+    return {**event_details, 'clarifications': clarifications}
+
+
+def template_validation(event_details: Dict[str, Any], missing_fields: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Build a validation result from stock questions when critical fields are empty.
+    
+    Args:
+        event_details: Structured event details
+        missing_fields: Fields reported missing by quick_validate
+        
+    Returns:
+        Validation result in the LLM's output format, or None if some missing
+        field has content and needs the LLM to judge it
+    """
+    if not missing_fields:
+        return None
+    
+    for field in missing_fields:
+        related = ('learnings', 'outcome') if field == 'learnings' else (field,)
+        if any(str(event_details.get(name) or '').strip() for name in related):
+            return None
+    
+    return {
+        "is_complete": False,
+        "missing_fields": list(missing_fields),
+        "clarifying_questions": [_FIELD_QUESTIONS[field] for field in missing_fields],
+        "validation_notes": "Critical details are missing"
+    }
@@ -3,76 +3,159 @@ Automatic LinkedIn Poster - Setup Module
 One-time configuration setup for the LinkedIn posting system.
 """
 
+import functools
 import json
 import os
+import stat
 import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Optional
-import requests
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote
+import orjson
+from credentials_loader import write_bytes_atomic
+
+# Partial-response mask for the existing-sheet lookup in setup_sheet; only the
+# sheet IDs and titles are read, so keep it that narrow
+SHEET_LOOKUP_FIELDS = 'sheets.properties(sheetId,title)'
+
+# Persona files at least this large are checked with a streaming parser (if
+# ijson is installed) instead of being loaded whole
+PERSONA_STREAM_MIN_BYTES = 64 * 1024
+
+# Sheets REST endpoint for spreadsheets
+SHEETS_API_BASE = "https://sheets.googleapis.com/v4/spreadsheets"
+
+# Seconds to wait on a Sheets API response
+SHEETS_TIMEOUT_SECONDS = 30
+
+# Top-level persona fields setup recommends having
+_EXPECTED_PERSONA_FIELDS = frozenset(('name', 'background', 'tone', 'skills'))
+
+# Attempts at a Sheets call that hits rate limits or server errors
+SHEETS_MAX_RETRIES = 5
+
+# Seconds a confirmed sheet setup is trusted before it is checked with the API again
+HEADERS_CACHE_TTL_SECONDS = 60
+
+# (spreadsheet_id, sheet_name, service account email) -> expiry (monotonic time)
+# for sheets whose tab and header row this process created or confirmed, so quick
+# repeat validations skip the API while deleted tabs or lost access still show up
+_HEADERS_CACHE: Dict[Tuple[str, str, str], float] = {}
+
+# (connect, read) timeouts in seconds for LinkedIn API calls; a dead host fails
+# fast instead of holding a setup worker for the whole read timeout
+LINKEDIN_TIMEOUT = (5, 30)
+
+# Column headers written to the first row of the posts sheet
+SHEET_HEADERS = ['post_number', 'post', 'attachments', 'to_be_posted_at', 'posted_at']
+
+
+@functools.lru_cache(maxsize=1)
+def get_linkedin_session():
+    """
+    Get the pooled session used for LinkedIn API calls.
+    
+    requests is imported here rather than at module load so setup prompts
+    appear without waiting on network libraries. Repeat requests reuse the
+    pooled connection instead of a new TLS handshake, and idempotent requests
+    are retried on rate limits and server errors.
+    
+    Returns:
+        Shared requests.Session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+    ))
+    return session
+
+
+@dataclass(frozen=True)
+class SetupInputs:
+    """Values entered by the user during setup."""
+    access_token: str  # LinkedIn OAuth2 access token
+    spreadsheet_id: str  # Google Sheets spreadsheet ID
+    sheet_name: str  # Sheet that holds the scheduled posts
+    service_account_file: Path  # Resolved service account JSON path
+    persona_file: Path  # Resolved persona JSON path
 
 
 class LinkedInSetup:
     """Handles LinkedIn API configuration and authentication."""
     
     @staticmethod
-    def get_person_urn(access_token: str) -> Optional[str]:
+    def get_person_urn(access_token: str) -> Tuple[Optional[str], str]:
         """
         Fetch the LinkedIn person URN using the access token.
         
+        Nothing is printed, so this is safe to run on a worker thread; the
+        caller reports the returned message.
+        
         Args:
             access_token: LinkedIn OAuth2 access token
             
         Returns:
-            Person URN string or None if failed
+            Tuple of (person URN or None if failed, status message)
         """
+        import requests
+        
         url = "https://api.linkedin.com/v2/userinfo"
         headers = {"Authorization": f"Bearer {access_token}"}
         
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = get_linkedin_session().get(url, headers=headers, timeout=LINKEDIN_TIMEOUT)
             response.raise_for_status()
             data = response.json()
             person_id = data.get("sub")
             if not person_id:
-                print("❌ Unable to retrieve person ID from LinkedIn API response")
-                return None
-            return f"urn:li:person:{person_id}"
+                return None, "❌ Unable to retrieve person ID from LinkedIn API response"
+            return f"urn:li:person:{person_id}", "✅ LinkedIn authentication successful"
         except requests.exceptions.RequestException as e:
-            print(f"❌ LinkedIn API request failed: {e}")
-            return None
+            return None, f"❌ LinkedIn API request failed: {e}"
         except (KeyError, ValueError, json.JSONDecodeError) as e:
-            print(f"❌ Error parsing LinkedIn API response: {e}")
-            return None
+            return None, f"❌ Error parsing LinkedIn API response: {e}"
         except Exception as e:
-            print(f"❌ Unexpected error fetching person_urn: {e}")
-            return None
+            return None, f"❌ Unexpected error fetching person_urn: {e}"
 
 
 class GoogleSheetsSetup:
     """Handles Google Sheets API configuration and sheet creation."""
     
-    def __init__(self, service_account_file: str):
+    def __init__(self, service_account_file: Optional[str] = None,
+                 service_account_info: Optional[Dict[str, Any]] = None):
         """
         Initialize Google Sheets service.
         
         Args:
             service_account_file: Path to service account JSON file
+            service_account_info: Already-parsed service account JSON, used
+                                  instead of reading service_account_file
         """
         self.service_account_file = service_account_file
-        self.service = None
+        self.service_account_info = service_account_info
+        self.session = None
         self._authenticate()
     
     def _authenticate(self):
         """Authenticate with Google Sheets API using service account."""
         try:
-            credentials = service_account.Credentials.from_service_account_file(
-                self.service_account_file,
-                scopes=['https://www.googleapis.com/auth/spreadsheets']
-            )
-            self.service = build('sheets', 'v4', credentials=credentials)
+            # Sessions are cached on the key's contents, so a replaced key
+            # file or a different upload gets a fresh session
+            if self.service_account_info is not None:
+                key_json = orjson.dumps(self.service_account_info, option=orjson.OPT_SORT_KEYS)
+            else:
+                key_json = Path(self.service_account_file).read_bytes()
+            self.session = _get_sheets_session(key_json)
         except FileNotFoundError:
             raise Exception(f"Service account file not found: {self.service_account_file}")
         except json.JSONDecodeError:
@@ -80,83 +163,213 @@ class GoogleSheetsSetup:
         except Exception as e:
             raise Exception(f"Failed to authenticate with Google Sheets: {e}")
     
-    def setup_sheet(self, spreadsheet_id: str, sheet_name: str) -> bool:
+    def setup_sheet(self, spreadsheet_id: str, sheet_name: str) -> Tuple[bool, str]:
         """
         Create or verify the sheet structure with required columns.
         
+        Progress is returned rather than printed, so callers on worker threads
+        don't interleave output. The fallback spreadsheets.get is limited to
+        SHEET_LOOKUP_FIELDS; extend that mask if this method starts reading
+        other sheet properties.
+        
         Args:
             spreadsheet_id: Google Sheets spreadsheet ID
             sheet_name: Name of the sheet to create/verify
             
         Returns:
-            True if successful, False otherwise
+            Tuple of (True if successful, status lines joined by newlines)
         """
+        from requests import HTTPError
+        
+        messages = []
+        
+        # Recently set up by this process with the same account; nothing to check or write
+        cache_key = (spreadsheet_id, sheet_name, self.session.credentials.service_account_email)
+        if _HEADERS_CACHE.get(cache_key, 0.0) > time.monotonic():
+            return True, f"✅ Sheet '{sheet_name}' already exists\n✅ Sheet headers already configured"
+        
         try:
-            # Check if sheet exists
-            sheet_metadata = self.service.spreadsheets().get(
-                spreadsheetId=spreadsheet_id
-            ).execute()
+            # Add the sheet and write its headers in a single round trip
+            sheet_id = _sheet_id_for(sheet_name)
+            self._batch_update(spreadsheet_id, [
+                {'addSheet': {'properties': {'sheetId': sheet_id, 'title': sheet_name}}},
+                self._header_cells_request(sheet_id)
+            ])
+            _HEADERS_CACHE[cache_key] = time.monotonic() + HEADERS_CACHE_TTL_SECONDS
+            return True, f"✅ Created new sheet: {sheet_name}\n✅ Added column headers to sheet"
             
-            sheets = sheet_metadata.get('sheets', [])
-            sheet_exists = any(
-                s['properties']['title'] == sheet_name for s in sheets
+        except HTTPError as e:
+            if e.response.status_code != 400 or 'already exists' not in e.response.text:
+                return False, f"❌ Google Sheets API error: {e.response.status_code} {e.response.text}"
+        except Exception as e:
+            return False, f"❌ Error setting up sheet: {e}"
+        
+        # The batch is applied atomically, so nothing was written; fall back to
+        # looking up the existing sheet by title (no range, which would fail if
+        # the tab is missing) and only fill in missing headers
+        try:
+            response = self.session.get(
+                f"{SHEETS_API_BASE}/{spreadsheet_id}",
+                params={'fields': SHEET_LOOKUP_FIELDS},
+                timeout=SHEETS_TIMEOUT_SECONDS
             )
+            response.raise_for_status()
+            sheet_metadata = response.json()
             
-            if not sheet_exists:
-                # Create new sheet
-                request_body = {
-                    'requests': [{
-                        'addSheet': {
-                            'properties': {
-                                'title': sheet_name
-                            }
-                        }
-                    }]
-                }
-                self.service.spreadsheets().batchUpdate(
-                    spreadsheetId=spreadsheet_id,
-                    body=request_body
-                ).execute()
-                print(f"✅ Created new sheet: {sheet_name}")
-            else:
-                print(f"✅ Sheet '{sheet_name}' already exists")
+            sheets = sheet_metadata.get('sheets', ())
+            sheets_by_title = {s['properties']['title']: s for s in sheets}
+            sheet = sheets_by_title.get(sheet_name)
             
-            # Add headers if sheet is empty
-            range_name = f"{sheet_name}!A1:E1"
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=range_name
-            ).execute()
+            if sheet is None:
+                # The generated sheetId clashed with another sheet; let the API pick one
+                reply = self._batch_update(spreadsheet_id, [{'addSheet': {'properties': {'title': sheet_name}}}])
+                sheet_id = reply['replies'][0]['addSheet']['properties']['sheetId']
+                has_headers = False
+                messages.append(f"✅ Created new sheet: {sheet_name}")
+            else:
+                sheet_id = sheet['properties']['sheetId']
+                header_range = quote(f"{_quote_sheet_name(sheet_name)}!A1:E1", safe='')
+                header_response = self.session.get(
+                    f"{SHEETS_API_BASE}/{spreadsheet_id}/values/{header_range}",
+                    params={'fields': 'values'},
+                    timeout=SHEETS_TIMEOUT_SECONDS
+                )
+                header_response.raise_for_status()
+                has_headers = any(any(row) for row in header_response.json().get('values', []))
+                messages.append(f"✅ Sheet '{sheet_name}' already exists")
             
-            values = result.get('values', [])
-            if not values:
-                headers = [['post_number', 'post', 'attachments', 'to_be_posted_at', 'posted_at']]
-                body = {'values': headers}
-                self.service.spreadsheets().values().update(
-                    spreadsheetId=spreadsheet_id,
-                    range=range_name,
-                    valueInputOption='RAW',
-                    body=body
-                ).execute()
-                print("✅ Added column headers to sheet")
+            if not has_headers:
+                self._batch_update(spreadsheet_id, [self._header_cells_request(sheet_id)])
+                messages.append("✅ Added column headers to sheet")
             else:
-                print("✅ Sheet headers already configured")
+                messages.append("✅ Sheet headers already configured")
             
-            return True
+            _HEADERS_CACHE[cache_key] = time.monotonic() + HEADERS_CACHE_TTL_SECONDS
+            return True, "\n".join(messages)
             
-        except HttpError as e:
-            print(f"❌ Google Sheets API error: {e}")
-            return False
+        except HTTPError as e:
+            messages.append(f"❌ Google Sheets API error: {e.response.status_code} {e.response.text}")
+            return False, "\n".join(messages)
         except Exception as e:
-            print(f"❌ Error setting up sheet: {e}")
-            return False
+            messages.append(f"❌ Error setting up sheet: {e}")
+            return False, "\n".join(messages)
+    
+    def _batch_update(self, spreadsheet_id: str, batch_requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply requests to the spreadsheet with a single spreadsheets.batchUpdate call.
+        
+        Args:
+            spreadsheet_id: Google Sheets spreadsheet ID
+            batch_requests: batchUpdate request objects
+            
+        Returns:
+            Parsed batchUpdate response
+            
+        Raises:
+            requests.HTTPError: If the API rejects the batch
+        """
+        response = self.session.post(
+            f"{SHEETS_API_BASE}/{spreadsheet_id}:batchUpdate",
+            json={'requests': batch_requests},
+            timeout=SHEETS_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    def _header_cells_request(sheet_id: int) -> Dict[str, Any]:
+        """
+        Build the batchUpdate request that writes the header row.
+        
+        Args:
+            sheet_id: Numeric ID of the sheet to write to
+            
+        Returns:
+            updateCells request for row 1
+        """
+        return {
+            'updateCells': {
+                'rows': [{'values': [{'userEnteredValue': {'stringValue': header}} for header in SHEET_HEADERS]}],
+                'fields': 'userEnteredValue',
+                'start': {'sheetId': sheet_id, 'rowIndex': 0, 'columnIndex': 0}
+            }
+        }
+
+
+@functools.lru_cache(maxsize=4)
+def _get_sheets_session(service_account_json: bytes):
+    """
+    Build an authorized Sheets session for a service account, cached per key.
+    
+    Repeated setups and validation clicks reuse the session, its token and its
+    open connection instead of loading the key and authenticating again.
+    
+    Args:
+        service_account_json: Service account JSON document, also the cache key
+        
+    Returns:
+        google.auth AuthorizedSession for the Sheets API
+    """
+    from google.auth.transport.requests import AuthorizedSession
+    from google.oauth2 import service_account
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    credentials = service_account.Credentials.from_service_account_info(
+        orjson.loads(service_account_json),
+        scopes=['https://www.googleapis.com/auth/spreadsheets']
+    )
+    # Only two REST endpoints are used, so call them directly instead of
+    # building a discovery-based client
+    session = AuthorizedSession(credentials)
+    # Back off and retry when the per-minute quota is hit or the API
+    # has a transient failure, honoring Retry-After when it is sent
+    session.mount('https://', HTTPAdapter(max_retries=Retry(
+        total=SHEETS_MAX_RETRIES,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503),
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )))
+    return session
+
+
+def _quote_sheet_name(sheet_name: str) -> str:
+    """
+    Quote a sheet name for use in A1 notation, so names with spaces, '!' or
+    apostrophes are read correctly.
+    
+    Args:
+        sheet_name: Sheet (tab) name
+        
+    Returns:
+        Name wrapped in single quotes, with inner quotes doubled
+    """
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+def _sheet_id_for(sheet_name: str) -> int:
+    """
+    Derive a stable sheetId from the sheet name.
+    
+    Choosing the ID up front lets the header write reference the new sheet in
+    the same batchUpdate that creates it.
+    
+    Args:
+        sheet_name: Title of the sheet
+        
+    Returns:
+        Non-negative 31-bit sheet ID
+    """
+    return zlib.crc32(sheet_name.encode('utf-8')) & 0x7FFFFFFF
 
 
 class ConfigurationManager:
     """Manages the creation and validation of configuration files."""
     
     @staticmethod
-    def validate_file_path(file_path: str, file_type: str) -> bool:
+    def validate_file_path(file_path: str, file_type: str) -> Optional[Path]:
         """
         Validate if a file exists and is readable.
         
@@ -165,25 +378,75 @@ class ConfigurationManager:
             file_type: Description of file type for error messages
             
         Returns:
-            True if file is valid, False otherwise
+            Absolute resolved path if file is valid, None otherwise
         """
-        path = Path(file_path)
-        if not path.exists():
+        try:
+            path = Path(file_path).resolve(strict=True)
+            st = path.stat()
+        except FileNotFoundError:
             print(f"❌ {file_type} not found: {file_path}")
-            return False
-        if not path.is_file():
+            return None
+        except (OSError, RuntimeError) as e:  # e.g. permissions, a non-directory in the path, symlink loops
+            print(f"❌ Cannot access {file_type}: {file_path} ({e})")
+            return None
+        if not stat.S_ISREG(st.st_mode):
             print(f"❌ {file_type} is not a file: {file_path}")
-            return False
+            return None
         if not os.access(path, os.R_OK):
             print(f"❌ {file_type} is not readable: {file_path}")
-            return False
-        return True
+            return None
+        return path
+    
+    @staticmethod
+    def find_top_level_keys(file_path: str, wanted: Iterable[str]) -> Set[str]:
+        """
+        Find which of the wanted keys appear at the root of a JSON object file.
+        
+        Files of PERSONA_STREAM_MIN_BYTES or more are scanned with ijson when it
+        is installed, stopping as soon as every wanted key has been seen; smaller
+        files (or no ijson) are parsed whole with orjson.
+        
+        Args:
+            file_path: Path to the JSON file
+            wanted: Keys to look for
+            
+        Returns:
+            The wanted keys present at the top level
+            
+        Raises:
+            ValueError: If the file is not valid JSON
+        """
+        wanted = set(wanted)
+        
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+        
+        if ijson is None or os.path.getsize(file_path) < PERSONA_STREAM_MIN_BYTES:
+            data = orjson.loads(Path(file_path).read_bytes())
+            return wanted & data.keys() if isinstance(data, dict) else set()
+        
+        found = set()
+        try:
+            with open(file_path, 'rb') as f:
+                for prefix, event, value in ijson.parse(f):
+                    if prefix == '' and event == 'map_key' and value in wanted:
+                        found.add(value)
+                        if found == wanted:
+                            break
+        except ijson.JSONError as e:
+            raise ValueError(str(e)) from e
+        return found
     
     @staticmethod
     def save_credentials(config: Dict[str, Any]) -> bool:
         """
         Save configuration to credentials.json file in user_info folder.
         
+        The file is written with write_bytes_atomic, so an interrupted setup
+        never leaves a truncated credentials.json behind.
+        
         Args:
             config: Configuration dictionary
             
@@ -197,8 +460,7 @@ class ConfigurationManager:
             
             # Save credentials in user_info folder
             credentials_path = user_info_dir / 'credentials.json'
-            with open(credentials_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2)
+            write_bytes_atomic(credentials_path, orjson.dumps(config, option=orjson.OPT_INDENT_2))
             print(f"✅ Configuration saved to {credentials_path}")
             return True
         except Exception as e:
@@ -206,21 +468,40 @@ class ConfigurationManager:
             return False
 
 
-def main():
-    """Main setup workflow."""
-    print("\n" + "="*60)
-    print("AUTOMATIC LINKEDIN POSTER - SETUP")
-    print("="*60)
-    print("\nThis setup will configure your LinkedIn posting system.")
-    print("Please have the following ready:")
-    print("  1. LinkedIn Access Token")
-    print("  2. Google Sheets Spreadsheet ID")
-    print("  3. Service Account JSON file")
-    print("  4. Persona JSON file")
-    print("-"*60 + "\n")
+def _authorized_sheets_setup(service_account_file: str) -> GoogleSheetsSetup:
+    """
+    Authenticate with Google Sheets and fetch an access token up front.
+    
+    The token request is a network round trip that would otherwise happen on
+    the first Sheets call, so fetching it here lets it overlap other checks.
+    
+    Args:
+        service_account_file: Path to service account JSON file
+        
+    Returns:
+        GoogleSheetsSetup whose session holds a valid access token
+        
+    Raises:
+        Exception: If the key cannot be loaded or Google rejects it
+    """
+    from google.auth.transport.requests import Request
+    
+    sheets_setup = GoogleSheetsSetup(service_account_file)
+    credentials = sheets_setup.session.credentials
+    if not credentials.valid:
+        credentials.refresh(Request())
+    return sheets_setup
+
+
+def _prompt_all() -> SetupInputs:
+    """
+    Ask for every setup value up front, before any network work starts.
     
-    config = {}
+    Exits the process if a required value is empty or a file is not usable.
     
+    Returns:
+        The collected setup inputs
+    """
     # Step 1: LinkedIn Configuration
     print("STEP 1: LinkedIn Configuration")
     print("-"*30)
@@ -230,21 +511,8 @@ def main():
         print("❌ Access token cannot be empty")
         sys.exit(1)
     
-    print("\nValidating LinkedIn access token...")
-    person_urn = LinkedInSetup.get_person_urn(access_token)
-    
-    if not person_urn:
-        print("❌ Failed to validate LinkedIn access token")
-        print("Please ensure your token is valid and has the required permissions.")
-        sys.exit(1)
-    
-    config['linkedin_access_token'] = access_token
-    config['person_urn'] = person_urn
-    print(f"✅ LinkedIn authentication successful")
-    print(f"   Person URN: {person_urn}\n")
-    
     # Step 2: Google Sheets Configuration
-    print("STEP 2: Google Sheets Configuration")
+    print("\nSTEP 2: Google Sheets Configuration")
     print("-"*30)
     
     spreadsheet_id = input("Enter Google Sheets Spreadsheet ID: ").strip()
@@ -263,26 +531,10 @@ def main():
         sys.exit(1)
     
     # Validate service account file
-    if not ConfigurationManager.validate_file_path(service_account_file, "Service Account file"):
+    service_account_path = ConfigurationManager.validate_file_path(service_account_file, "Service Account file")
+    if service_account_path is None:
         sys.exit(1)
     
-    # Setup Google Sheets
-    print("\nConfiguring Google Sheets...")
-    try:
-        sheets_setup = GoogleSheetsSetup(service_account_file)
-        if not sheets_setup.setup_sheet(spreadsheet_id, sheet_name):
-            print("❌ Failed to setup Google Sheets")
-            sys.exit(1)
-    except Exception as e:
-        print(f"❌ Google Sheets setup failed: {e}")
-        sys.exit(1)
-    
-    config['google_sheets'] = {
-        'spreadsheet_id': spreadsheet_id,
-        'sheet_name': sheet_name,
-        'service_account_file': os.path.abspath(service_account_file)
-    }
-    
     # Step 3: Persona Configuration
     print("\nSTEP 3: Persona Configuration")
     print("-"*30)
@@ -293,30 +545,109 @@ def main():
         sys.exit(1)
     
     # Validate persona file
-    if not ConfigurationManager.validate_file_path(persona_path, "Persona file"):
+    persona_file = ConfigurationManager.validate_file_path(persona_path, "Persona file")
+    if persona_file is None:
         sys.exit(1)
     
-    # Validate persona.json structure
-    try:
-        with open(persona_path, 'r', encoding='utf-8') as f:
-            persona_data = json.load(f)
-        print("✅ Persona file is valid JSON")
+    return SetupInputs(
+        access_token=access_token,
+        spreadsheet_id=spreadsheet_id,
+        sheet_name=sheet_name,
+        service_account_file=service_account_path,
+        persona_file=persona_file
+    )
+
+
+def _validate_and_setup(inputs: SetupInputs) -> Dict[str, Any]:
+    """
+    Validate the LinkedIn token and persona file, then set up the sheet.
+    
+    The LinkedIn token check and the Google token fetch are independent
+    network calls, so they run on worker threads while the persona file is
+    checked locally. Results are reported once everything finishes, and the
+    sheet is only created or modified after the token and persona file pass.
+    Exits the process if any check fails.
+    
+    Args:
+        inputs: Values collected by _prompt_all
+        
+    Returns:
+        Configuration to save to credentials.json
+    """
+    print("\nValidating LinkedIn access token, authenticating with Google Sheets and checking persona file...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        urn_future = executor.submit(LinkedInSetup.get_person_urn, inputs.access_token)
+        sheets_future = executor.submit(_authorized_sheets_setup, str(inputs.service_account_file))
         
-        # Optional: Check for expected fields
-        expected_fields = ['name', 'background', 'tone', 'skills']
-        missing_fields = [field for field in expected_fields if field not in persona_data]
-        if missing_fields:
-            print(f"⚠️  Warning: Persona file is missing recommended fields: {', '.join(missing_fields)}")
-            print("   The system will still work, but posts may be less personalized.")
+        found_fields, persona_error = set(), None
+        try:
+            found_fields = ConfigurationManager.find_top_level_keys(inputs.persona_file, _EXPECTED_PERSONA_FIELDS)
+        except Exception as e:
+            persona_error = e
         
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON in persona file: {e}")
+        person_urn, linkedin_message = urn_future.result()
+        sheets_error = sheets_future.exception()
+    
+    print(linkedin_message)
+    if not person_urn:
+        print("Please ensure your token is valid and has the required permissions.")
         sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error reading persona file: {e}")
+    print(f"   Person URN: {person_urn}")
+    
+    # Validate persona.json structure
+    if isinstance(persona_error, ValueError):  # json, orjson and streamed parse errors
+        print(f"❌ Invalid JSON in persona file: {persona_error}")
+        sys.exit(1)
+    if persona_error is not None:
+        print(f"❌ Error reading persona file: {persona_error}")
+        sys.exit(1)
+    print("✅ Persona file is valid JSON")
+    
+    # Optional: Check for expected fields
+    missing_fields = _EXPECTED_PERSONA_FIELDS - found_fields
+    if missing_fields:
+        print(f"⚠️  Warning: Persona file is missing recommended fields: {', '.join(sorted(missing_fields))}")
+        print("   The system will still work, but posts may be less personalized.")
+    
+    if sheets_error is not None:
+        print(f"❌ Google Sheets setup failed: {sheets_error}")
         sys.exit(1)
     
-    config['persona_path'] = os.path.abspath(persona_path)
+    # Only touch the sheet once everything else is known to be valid
+    sheets_ok, sheets_message = sheets_future.result().setup_sheet(inputs.spreadsheet_id, inputs.sheet_name)
+    print(sheets_message)
+    if not sheets_ok:
+        print("❌ Failed to setup Google Sheets")
+        sys.exit(1)
+    
+    return {
+        'linkedin_access_token': inputs.access_token,
+        'person_urn': person_urn,
+        'google_sheets': {
+            'spreadsheet_id': inputs.spreadsheet_id,
+            'sheet_name': inputs.sheet_name,
+            'service_account_file': str(inputs.service_account_file)
+        },
+        'persona_path': str(inputs.persona_file)
+    }
+
+
+def main():
+    """Main setup workflow."""
+    print("\n" + "="*60)
+    print("AUTOMATIC LINKEDIN POSTER - SETUP")
+    print("="*60)
+    print("\nThis setup will configure your LinkedIn posting system.")
+    print("Please have the following ready:")
+    print("  1. LinkedIn Access Token")
+    print("  2. Google Sheets Spreadsheet ID")
+    print("  3. Service Account JSON file")
+    print("  4. Persona JSON file")
+    print("-"*60 + "\n")
+    
+    # Collect every input first, then do all validation work together
+    inputs = _prompt_all()
+    config = _validate_and_setup(inputs)
     
     # Step 4: Save Configuration
     print("\nSTEP 4: Saving Configuration")
@@ -328,11 +659,11 @@ def main():
         print("="*60)
         print("\nYour LinkedIn posting system is now configured.")
         print("\nConfiguration summary:")
-        print(f"  • LinkedIn Person URN: {person_urn}")
-        print(f"  • Google Sheet: {spreadsheet_id}")
-        print(f"  • Sheet Name: {sheet_name}")
-        print(f"  • Service Account: {os.path.basename(service_account_file)}")
-        print(f"  • Persona File: {os.path.basename(persona_path)}")
+        print(f"  • LinkedIn Person URN: {config['person_urn']}")
+        print(f"  • Google Sheet: {inputs.spreadsheet_id}")
+        print(f"  • Sheet Name: {inputs.sheet_name}")
+        print(f"  • Service Account: {inputs.service_account_file.name}")
+        print(f"  • Persona File: {inputs.persona_file.name}")
         print("\nNext steps:")
         print("  1. Run 'python main.py' to create and schedule posts")
         print("  2. Run 'python background.py' to start the auto-posting service")
@@ -25,6 +25,7 @@ class EventDetails(TypedDict):
     acknowledgements: Optional[List[str]]  # people/orgs to thank or tag
     engagement_question: Optional[str]  # question to drive interaction
     attachments: Optional[List[str]]  # media paths/URLs
+    clarifications: Optional[List[Dict[str, str]]]  # user's answers to clarifying questions ({question, answer})
 
 
 class PersonaContext(TypedDict):
@@ -34,8 +35,14 @@ class PersonaContext(TypedDict):
     career_goal_alignment: Optional[str]  # how this aligns with goals
 
 
-class WorkflowState(TypedDict):
-    """Main state object passed between nodes in the workflow."""
+class WorkflowState(TypedDict, total=False):
+    """
+    Main state object passed between nodes in the workflow.
+    
+    Keys are optional so a state can start empty and be filled in node by node.
+    Every key a node reads must be declared here, because LangGraph only carries
+    declared keys from one node to the next.
+    """
     # User input
     raw_input: Optional[str]  # Original rough notes from user
     media_paths: Optional[List[str]]  # Attachment paths
@@ -76,3 +83,7 @@ class WorkflowState(TypedDict):
     # Error handling
     error: Optional[str]  # Any error messages
     error_node: Optional[str]  # Which node had the error
+    
+    # Gradio interface
+    gradio_mode: Optional[bool]  # Skip terminal prompts when driven by the web UI
+    clarification_answers: Optional[List[str]]  # Answers submitted through the web UI